@@ -0,0 +1,131 @@
+# asr_grammars.py
+# 대화 문맥별 Vosk 문법(grammar) 목록 — 손으로 관리하지 않고 파서 테이블에서 생성한다.
+#   fxapi_en.ALIASES      → 통화 토큰
+#   fxapi_en.NUMBER_WORDS → 금액 ("one hundred fifty" → words_to_digits 로 150)
+#   weatherapi_en.CITY_ALIASES → 도시 토큰
+#   voice_router.WHEN_PAT → 날짜/요일 토큰
+#   confidence_gate.YES_WORDS / NO_WORDS → 확인 질문 답
+# "default" 는 웨이크워드 + 모든 문맥의 합집합, 나머지는 후속 질문(follow-up)용 축소 문법.
+import json
+import re
+import sys
+import time
+import wave
+
+from fxapi_en import ALIASES, CONNECTORS, NUMBER_WORDS, TARGET_JOINERS
+from weatherapi_en import CITY_ALIASES
+from voice_router import WHEN_PAT
+from confidence_gate import YES_WORDS, NO_WORDS
+
+UNK = "[unk]"  # 문법 밖 발화는 억지로 맞추지 않고 [unk] 로 떨어지게
+
+# Wake words (boost)
+WAKE_PHRASES = ["hey there", "hello there", "the hey there", "the hello there"]
+
+# Sentence patterns (questions)
+# NOTE: 'what's the weather like in', 'how is the weather in' 사이에 반드시 콤마!
+WEATHER_PATTERNS = [
+    "what is the weather in", "what's the weather in", "what's the weather like in", "how is the weather in",
+    "what is the temperature in", "temperature in", "weather in",
+    "weather now in", "temperature now in", "now in", "right now in",
+    "weather", "temperature", "forecast",
+]
+WEATHER_EXTRA_WHEN = ["now", "day after tomorrow"]
+
+# Currency intent words / connectors
+FX_INTENT_WORDS = ["currency", "exchange", "rate", "rates", "fx", "exchange rate", "convert"]
+
+
+def _alternatives(pat: re.Pattern) -> list[str]:
+    """\\b(a|b|c)\\b 형태의 정규식에서 대안 토큰만 추출."""
+    m = re.search(r"\(([^()]*)\)", pat.pattern)
+    if not m:
+        return []
+    return [a.replace("\\s+", " ").replace("\\s", " ").lower() for a in m.group(1).split("|")]
+
+
+def _uniq(seq):
+    # 가능하면 전부 소문자. (대문자 토큰은 vocab 경고가 뜨기 쉬움)
+    return list(dict.fromkeys(s.strip().lower() for s in seq if s.strip()))
+
+
+def currency_tokens() -> list[str]:
+    return _uniq(ALIASES.keys())
+
+
+def city_tokens() -> list[str]:
+    return _uniq(CITY_ALIASES.keys())
+
+
+def when_tokens() -> list[str]:
+    return _uniq(_alternatives(WHEN_PAT) + WEATHER_EXTRA_WHEN)
+
+
+def build_grammars() -> dict[str, list[str]]:
+    connectors = _uniq(sorted(CONNECTORS) + ["from"] + sorted(TARGET_JOINERS))
+    fx = _uniq(FX_INTENT_WORDS + connectors + currency_tokens() + NUMBER_WORDS)
+    weather = _uniq(WEATHER_PATTERNS + city_tokens() + when_tokens() + ["in"])
+    return {
+        "default": _uniq(WAKE_PHRASES + weather + fx),
+        # "exchange rate" 이후: 통화 토큰 + 연결어만
+        "fx": _uniq(WAKE_PHRASES + fx) + [UNK],
+        # "weather" 이후: 도시 + 날짜 토큰만
+        "weather": _uniq(WAKE_PHRASES + weather) + [UNK],
+        # "Did you say ...?" 이후: 예/아니오만
+        "confirm": _uniq(WAKE_PHRASES + sorted(YES_WORDS) + sorted(NO_WORDS)) + [UNK],
+    }
+
+
+CONTEXT_GRAMMARS = build_grammars()
+PHRASES = CONTEXT_GRAMMARS["default"]
+
+
+# ------------------- 벤치마크 -------------------
+def _decode(model, grammar, pcm: bytes, sr: int, block: int = 4096) -> tuple[str, float]:
+    from vosk import KaldiRecognizer
+    rec = KaldiRecognizer(model, sr, json.dumps(grammar))
+    t0 = time.perf_counter()
+    texts = []
+    for i in range(0, len(pcm), block * 2):
+        if rec.AcceptWaveform(pcm[i:i + block * 2]):
+            texts.append(json.loads(rec.Result()).get("text", ""))
+    texts.append(json.loads(rec.FinalResult()).get("text", ""))
+    return " ".join(t for t in texts if t), time.perf_counter() - t0
+
+
+def benchmark(wav_items, model_path="models/vosk-model-en-us-0.22-lgraph"):
+    """
+    wav_items: [(context, path)] — 16 kHz mono int16 WAV.
+    같은 오디오를 전체 문법과 문맥 문법으로 각각 디코딩해 RTF(real-time factor)와 결과 텍스트를 비교.
+    """
+    from vosk import Model, SetLogLevel
+    SetLogLevel(-1)
+    model = Model(model_path)
+    tot = {"default": 0.0, "context": 0.0, "audio": 0.0}
+    for ctx, path in wav_items:
+        with wave.open(path, "rb") as w:
+            sr = w.getframerate()
+            pcm = w.readframes(w.getnframes())
+            dur = w.getnframes() / sr
+        full_txt, full_t = _decode(model, CONTEXT_GRAMMARS["default"], pcm, sr)
+        ctx_txt, ctx_t = _decode(model, CONTEXT_GRAMMARS[ctx], pcm, sr)
+        tot["default"] += full_t
+        tot["context"] += ctx_t
+        tot["audio"] += dur
+        print(f"[Grammar] {path} ({ctx}, {dur:.1f}s)")
+        print(f"   default RTF {full_t / dur:.3f}: {full_txt!r}")
+        print(f"   {ctx:7s} RTF {ctx_t / dur:.3f}: {ctx_txt!r}")
+    if tot["audio"]:
+        print(f"[Grammar] total RTF default {tot['default'] / tot['audio']:.3f} "
+              f"vs context {tot['context'] / tot['audio']:.3f} "
+              f"(speedup x{tot['default'] / max(tot['context'], 1e-9):.2f})")
+
+
+if __name__ == "__main__":
+    # 사용법: python asr_grammars.py fx:yen_to_won.wav weather:tokyo_tomorrow.wav ...
+    #        (인자 없으면 문맥별 문법 크기만 출력)
+    for name, g in CONTEXT_GRAMMARS.items():
+        print(f"[Grammar] {name}: {len(g)} entries")
+    items = [a.split(":", 1) for a in sys.argv[1:]]
+    if items:
+        benchmark([(c, p) for c, p in items])
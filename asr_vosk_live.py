@@ -1,60 +1,75 @@
 # asr_vosk_live.py
-import json, queue, sys, time
-import sounddevice as sd
+import json, os, queue, sys, time
 from vosk import Model, KaldiRecognizer
+from pitch_stream import StreamingPitchEstimator
+from audio_frontend import CaptureFrontEnd
 
 # 라우터: on_asr_final + recognizer reset 콜백 연결
-from voice_router import on_asr_final, set_recognizer_reset
+from voice_router import on_asr_final, set_recognizer_reset, set_grammar_switch, has_followup_slot
+from asr_grammars import CONTEXT_GRAMMARS, UNK
 
 MODEL_PATH = "models/vosk-model-en-us-0.22-lgraph"
 SAMPLE_RATE = 16000
 BLOCKSIZE = 4096  # ~0.256s @16k mono. 필요 시 3072/2048로 더 줄여도 OK.
+CAPTURE_DEVICE = None  # sounddevice 장치 번호/이름 (None = 기본 입력). native rate/채널로 열고 16k 모노로 변환
+# 캡처 채널 수 강제 (미지정 시: 실제 장치는 최대 8ch, default/pulse 등 가상 장치는 모노)
+CAPTURE_CHANNELS = int(os.environ["CAPTURE_CHANNELS"]) if os.environ.get("CAPTURE_CHANNELS") else None
+# 최종 인식 결과(단어별 conf 포함)를 JSONL 로 남김 → 라벨링 후 confidence_eval.py 로 임계값 평가
+ASR_LOG_PATH = os.environ.get("ASR_LOG_PATH")
 
-# NOTE:
-# - 가능하면 전부 소문자. (대문자 토큰은 vocab 경고가 뜨기 쉬움)
-# - 'what's the weather like in', 'how is the weather in' 사이에 반드시 콤마!
-PHRASES = [
-    # Wake words (boost)
-    "hey there", "hello there", "the hey there", "the hello there",
-
-    # Sentence patterns (questions)
-    "what is the weather in", "what's the weather in", "what's the weather like in", "how is the weather in",
-
-    # Date tokens (query helpers)
-    "what is the temperature in", "temperature in", "weather in",
-    "weather now in", "temperature now in", "now in", "right now in",
-    "now", "today", "tomorrow", "day after tomorrow",
-
-    # Weekdays
-    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
-
-    # City names (formal + common typos/variants)
-    "miyazaki", "miyasaki", "miya zaki",
-    "toronto", "tokyo", "busan", "pusan", "seoul", "seol", "soul", "new york",
-
-    # Currency intent words / connectors
-    "currency", "exchange", "rate", "rates", "fx",
-    "to", "from", "in", "into",
-
-    # Currency / country names (소문자)
-    # 한국 원 / 대한민국
-    "kor", "krw", "won", "korean", "korea", "seoul", "busan", "pusan",
-    # 일본 엔 / 일본
-    "jp", "jpy", "yen", "japanese", "japan", "tokyo", "osaka",
-    # 미국 달러 / 미국
-    "usd", "dollar", "us", "u s", "america", "american",
-    # 캐나다 달러 / 캐나다
-    "cad", "canadian", "canada",
-]
+# 문맥별 문법은 asr_grammars 에서 ALIASES / CITY_ALIASES / WHEN_PAT 로부터 생성
+# - "default": 웨이크워드 + 전체 어휘 (기존 PHRASES)
+# - "fx" / "weather": 후속 질문용 축소 문법 (라우터가 처리 직후 전환 요청)
+PHRASES = CONTEXT_GRAMMARS["default"]
 
 def _is_wake_like(text: str) -> bool:
     t = text.strip().lower()
     return t in ("hey there", "hello there")
 
+def _strip_unk(text: str) -> str:
+    return " ".join(t for t in text.split() if t != UNK)
+
+def _utterance_conf(words) -> float | None:
+    confs = [w.get("conf", 1.0) for w in words if w.get("word") != UNK]
+    return sum(confs) / len(confs) if confs else None
+
+def _log_result(text: str, words, ctx: str):
+    if not ASR_LOG_PATH:
+        return
+    try:
+        with open(ASR_LOG_PATH, "a") as f:
+            f.write(json.dumps({"ts": time.time(), "ctx": ctx, "text": text, "result": words}) + "\n")
+    except Exception as e:
+        print(f"[Vosk] log failed: {e!r}", file=sys.stderr)
+
 def main():
     model = Model(MODEL_PATH)
-    rec = KaldiRecognizer(model, SAMPLE_RATE, json.dumps(PHRASES))
-    rec.SetWords(True)
+
+    # 문맥별 인식기를 미리 컴파일해 두고 발화 경계에서 교체
+    recognizers = {}
+    for ctx, grammar in CONTEXT_GRAMMARS.items():
+        r = KaldiRecognizer(model, SAMPLE_RATE, json.dumps(grammar))
+        r.SetWords(True)
+        recognizers[ctx] = r
+    rec = recognizers["default"]
+    active_ctx = "default"
+    ctx_until = 0.0   # 후속 문맥 만료 시각 (만료 후 default 로 복귀)
+
+    def switch_grammar(ctx: str, ttl_sec: float = 0.0):
+        nonlocal rec, active_ctx, ctx_until
+        if ctx not in recognizers:
+            ctx = "default"
+        ctx_until = time.time() + ttl_sec if ctx != "default" else 0.0
+        if ctx == active_ctx:
+            return
+        rec = recognizers[ctx]
+        rec.Reset()
+        active_ctx = ctx
+        print(f"[Vosk] Grammar -> {ctx}")
+    set_grammar_switch(switch_grammar)
+
+    # 발화 단위 F0 통계 (speaker profile) — 같은 오디오 블록을 공유
+    pitch = StreamingPitchEstimator(sr=SAMPLE_RATE)
 
     # 라우터가 TTS 직후 인식기 버퍼를 리셋할 수 있도록 콜백 연결
     def reset_recognizer():
@@ -62,23 +77,28 @@ def main():
             rec.Reset()
         except Exception:
             pass
+        pitch.reset()
     set_recognizer_reset(reset_recognizer)
 
     # Limit the number of audio chunks queued to prevent overflow
     q = queue.Queue(maxsize=8)
 
-    def audio_cb(indata, frames, time_info, status):
+    def audio_cb(pcm, status):
+        # pcm: 16 kHz mono int16 bytes (CaptureFrontEnd 가 다운믹스/리샘플링 완료)
         if status:
             print(status, file=sys.stderr)
         try:
-            q.put_nowait(bytes(indata))
+            q.put_nowait(pcm)
         except queue.Full:
             # If the queue is full, discard the oldest chunk to avoid delay
             _ = q.get_nowait()
-            q.put_nowait(bytes(indata))
+            q.put_nowait(pcm)
 
-    with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCKSIZE,
-                           dtype="int16", channels=1, callback=audio_cb):
+    capture = CaptureFrontEnd(device=CAPTURE_DEVICE, target_rate=SAMPLE_RATE, blocksize=BLOCKSIZE,
+                              channels=CAPTURE_CHANNELS)
+    print(f"[Vosk] Capture: {capture.describe()}")
+
+    with capture.open(audio_cb):
         print("[Vosk] Listening... (Ctrl+C to stop)")
         partial_last = ""
         last_final_text = ""
@@ -87,16 +107,25 @@ def main():
         try:
             while True:
                 data = q.get()
+
+                # 후속 문맥 만료 — 말하는 중(partial 진행 중)이 아닐 때만 복귀
+                if active_ctx != "default" and not partial_last and time.time() > ctx_until:
+                    switch_grammar("default")
+
+                pitch.feed(data)
                 if rec.AcceptWaveform(data):
                     result = json.loads(rec.Result())
-                    text = result.get("text", "").strip()
+                    text = _strip_unk(result.get("text", "")).strip()
                     if text:
                         # 1) Filter out too short or meaningless results
                         tokens = text.split()
 
-                        # 짧은 결과 필터 — 단, 웨이크워드는 통과
-                        if (len(text) < 3 or len(tokens) < 2) and not _is_wake_like(text):
+                        # 짧은 결과 필터 — 단, 웨이크워드와 후속 문맥의 슬롯 한 단어 답("tokyo", "yen", "yes")은 통과
+                        # (라우터가 직전 질의의 통화/도시/날짜와 합쳐 "usd to krw", "weather tomorrow in tokyo" 로 처리)
+                        if ((len(text) < 3 or len(tokens) < 2) and not _is_wake_like(text)
+                                and not has_followup_slot(active_ctx, text)):
                             rec.Reset()
+                            pitch.reset()
                             partial_last = ""
                             continue
 
@@ -104,16 +133,26 @@ def main():
                         now = time.time()
                         if text == last_final_text and (now - last_final_ts) < 1.0:
                             rec.Reset()
+                            pitch.reset()
                             partial_last = ""
                             continue
 
-                        print(">>", text)
-                        on_asr_final(text, confidence=None)
+                        speaker = pitch.profile()
+                        words = [w for w in result.get("result", []) if w.get("word") != UNK]
+                        conf = _utterance_conf(words)
+                        print(">>", text, f"(conf {conf:.2f})" if conf is not None else "")
+                        _log_result(text, words, active_ctx)
+                        on_asr_final(text, confidence=conf, speaker=speaker, words=words)
 
                         # Update state and reset (중요!)
                         last_final_text = text
                         last_final_ts = now
                         rec.Reset()
+                        pitch.reset()
+                        partial_last = ""
+                    else:
+                        # 빈 결과(무음 구간 종료) — 다음 발화 통계에 섞이지 않도록 비움
+                        pitch.reset()
                         partial_last = ""
                 else:
                     part = json.loads(rec.PartialResult()).get("partial", "")
@@ -0,0 +1,156 @@
+# audio_frontend.py
+# 마이크를 장치 고유(native) 샘플레이트/채널 수로 열고, 블록 단위로
+#   다채널 → 모노 합산(delay-and-sum, 지연 0) → 폴리페이즈 FIR 리샘플링 → 16 kHz int16
+# 으로 바꿔 Vosk 에 넘긴다. 추가 지연은 FIR 필터 지연((L-1)/2 샘플)뿐.
+# USB 마이크 어레이 / 블루투스 헤드셋처럼 44.1/48 kHz 다채널만 지원하는 장치용.
+import time
+from math import gcd
+
+import numpy as np
+
+TARGET_RATE = 16000
+TAPS_PER_PHASE = 48     # 위상당 탭 수 (입력 샘플 기준 필터 길이)
+CUTOFF = 0.9            # 출력 나이퀴스트(8 kHz) 대비 통과대역 끝
+KAISER_BETA = 7.0       # ~70 dB 저지대역
+MAX_CAPTURE_CHANNELS = 8  # 자동 선택 시 상한 (마이크 어레이는 보통 2~8ch)
+# ALSA/Pulse/PipeWire 가상 장치는 max_input_channels 를 32 등으로 보고함 → 모노로 연다
+VIRTUAL_DEVICES = {"default", "sysdefault", "pulse", "pipewire", "jack", "dsnoop", "dmix"}
+
+
+class PolyphaseResampler:
+    """
+    in_rate → out_rate 유리수 비율(up/down) 스트리밍 리샘플러.
+    블록 경계는 내부 history 로 이어 붙이므로 블록 크기와 상관없이 한 번에 처리한 것과 같은 출력.
+    출력 샘플 n 은 y[n] = sum_k x[j - k] * h[p + k*up],  j = (n*down)//up, p = (n*down) % up
+    를 블록 전체에 대해 한 번에(einsum) 계산한다.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = TARGET_RATE, taps_per_phase: int = TAPS_PER_PHASE,
+                 cutoff: float = CUTOFF, beta: float = KAISER_BETA):
+        g = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.in_rate, self.out_rate = int(in_rate), int(out_rate)
+
+        K = taps_per_phase
+        L = K * self.up
+        fc = cutoff * 0.5 / max(self.up, self.down)   # 업샘플 도메인 기준 (cycles/sample)
+        m = np.arange(L) - (L - 1) / 2.0
+        h = 2 * fc * np.sinc(2 * fc * m) * np.kaiser(L, beta)
+        h *= self.up / h.sum()                         # 위상별 DC 이득 ≈ 1
+
+        # H[p, k] = h[p + k*up], 오름차순 입력 창과 바로 내적하도록 k 축을 뒤집어 둠
+        self._Hr = np.ascontiguousarray(h.reshape(K, self.up).T[:, ::-1]).astype(np.float32)
+        self._K = K
+        self.delay_sec = (L - 1) / 2.0 / (self.in_rate * self.up)
+        self.reset()
+
+    def reset(self):
+        self._hist = np.zeros(self._K - 1, dtype=np.float32)
+        self._start = -(self._K - 1)   # _hist[0] 의 절대 입력 인덱스
+        self._n = 0                    # 다음 출력 샘플 번호
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        K, up, down = self._K, self.up, self.down
+        buf = np.concatenate([self._hist, np.asarray(x, dtype=np.float32)])
+        end = self._start + len(buf)                  # 사용 가능한 입력 끝 (절대, exclusive)
+        n_stop = -(-end * up // down)                 # j(n) <= end-1 인 마지막 n + 1
+        n = np.arange(self._n, n_stop, dtype=np.int64)
+        t = n * down
+        j = t // up
+        p = t - j * up
+        win = np.lib.stride_tricks.sliding_window_view(buf, K)[j - (K - 1) - self._start]
+        y = np.einsum("mk,mk->m", win, self._Hr[p])
+
+        self._n = n_stop
+        self._hist = buf[len(buf) - (K - 1):].copy()
+        self._start = end - (K - 1)
+        return y
+
+
+def downmix(block: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+    """(frames, channels) → (frames,). 지연 0 delay-and-sum = 채널 평균 (가중치 지정 가능)."""
+    if block.ndim == 1 or block.shape[1] == 1:
+        return block.reshape(-1).astype(np.float32)
+    if weights is None:
+        return block.mean(axis=1, dtype=np.float32)
+    w = np.asarray(weights, dtype=np.float32)
+    return block.astype(np.float32) @ (w / w.sum())
+
+
+def auto_channels(info) -> int:
+    """sd.query_devices() 정보로 캡처 채널 수 결정: 가상 장치는 1, 실제 장치는 MAX_CAPTURE_CHANNELS 까지."""
+    name = str(info.get("name", "")).strip().lower()
+    if name.split(":")[0].split(" ")[0] in VIRTUAL_DEVICES:
+        return 1
+    return max(1, min(int(info["max_input_channels"]), MAX_CAPTURE_CHANNELS))
+
+
+class CaptureFrontEnd:
+    """
+    장치를 native rate / 채널로 열고 콜백에는 16 kHz 모노 int16 bytes 를 넘긴다.
+    장치가 이미 16 kHz 모노면 기존과 같은 RawInputStream 경로(변환 없음).
+    """
+
+    def __init__(self, device=None, target_rate: int = TARGET_RATE, blocksize: int = 4096,
+                 native_rate: int | None = None, channels: int | None = None, weights=None):
+        if native_rate is None or channels is None:
+            import sounddevice as sd
+            info = sd.query_devices(device, "input")
+            native_rate = native_rate or int(info["default_samplerate"])
+            channels = channels or auto_channels(info)
+        self.device = device
+        self.target_rate = target_rate
+        self.native_rate = int(native_rate)
+        self.channels = int(channels)
+        self.weights = weights
+        self.passthrough = self.native_rate == target_rate and self.channels == 1
+        self.resampler = None if self.native_rate == target_rate else PolyphaseResampler(self.native_rate, target_rate)
+        # 출력이 대략 blocksize 샘플이 되도록 입력 블록 크기 환산
+        self.native_blocksize = int(round(blocksize * self.native_rate / target_rate))
+
+    def convert(self, indata: np.ndarray) -> bytes:
+        x = downmix(indata, self.weights)
+        if self.resampler is not None:
+            x = self.resampler.process(x)
+        return np.clip(np.rint(x), -32768, 32767).astype(np.int16).tobytes()
+
+    def open(self, callback):
+        """callback(pcm_bytes, status) 를 호출하는 입력 스트림 (with 문으로 사용)."""
+        import sounddevice as sd
+        if self.passthrough:
+            def _raw_cb(indata, frames, time_info, status):
+                callback(bytes(indata), status)
+            return sd.RawInputStream(samplerate=self.target_rate, blocksize=self.native_blocksize,
+                                     device=self.device, dtype="int16", channels=1, callback=_raw_cb)
+
+        def _cb(indata, frames, time_info, status):
+            callback(self.convert(indata), status)
+        return sd.InputStream(samplerate=self.native_rate, blocksize=self.native_blocksize,
+                              device=self.device, dtype="int16", channels=self.channels, callback=_cb)
+
+    def describe(self) -> str:
+        if self.passthrough:
+            return f"{self.native_rate} Hz x{self.channels} (passthrough)"
+        r = self.resampler
+        extra = f", resample {r.up}/{r.down}, delay {r.delay_sec * 1000:.1f} ms" if r else ""
+        return f"{self.native_rate} Hz x{self.channels} -> {self.target_rate} Hz mono{extra}"
+
+
+if __name__ == "__main__":
+    # 블록당 CPU 시간 측정 (출력 4096 샘플 ≈ 256 ms 에 해당하는 입력 블록)
+    rng = np.random.default_rng(0)
+    for rate, ch in [(48000, 1), (48000, 2), (48000, 4), (44100, 1), (44100, 2), (32000, 1), (16000, 2)]:
+        fe = CaptureFrontEnd(native_rate=rate, channels=ch)
+        nb = fe.native_blocksize
+        block = (rng.standard_normal((nb, ch)) * 3000).astype(np.int16)
+        for _ in range(5):
+            fe.convert(block)
+        reps = 200
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            fe.convert(block)
+        per = (time.perf_counter() - t0) / reps
+        block_sec = nb / rate
+        print(f"[Capture] {fe.describe():55s} {per * 1e6:8.0f} us/block "
+              f"({per / block_sec * 100:.2f}% of {block_sec * 1000:.0f} ms)")
@@ -0,0 +1,156 @@
+# bench_fetch.py
+# 로컬 스텁 서버(stub_providers)를 상대로 음성 질의를 동시에 흘려 handle_fx_query / handle_weather_query 의
+# 응답 시간(p50/p99)과 성공률을 장애 시나리오별로 측정한다.
+#
+#   python bench_fetch.py                       # 전체 시나리오
+#   python bench_fetch.py -s flaky -n 400 -c 32 # 특정 시나리오만
+import argparse
+import contextlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fxapi_en
+import weatherapi_en
+from stub_providers import StubBehavior, start_stubs, provider_urls
+
+# 음성 스타일 질의 (라우터가 잘라낸 뒤의 형태)
+FX_QUERIES = [
+    "exchange rate usd to jpy",
+    "exchange rate dollar to won",
+    "rate yen to won",
+    "currency usd to cad",
+    "exchange rate korea to japan",
+    "convert dollars to yen, won and canadian",
+]
+WEATHER_QUERIES = [
+    "weather in tokyo",
+    "weather tomorrow in toronto",
+    "temperature in seoul",
+    "weather on friday in busan",
+    "wind in new york",
+    "weather in toronto, tokyo and seoul",
+]
+
+# 사용자에게 실패로 들리는 응답 (여러 도시 응답은 한 도시라도 포함되면 실패)
+FAILURE_REPLIES = (
+    "I couldn't", "That pair is not supported", "Failure",
+    "There was a problem", "An unexpected error", "I could not find",
+)
+
+OK = StubBehavior(latency_ms=20, jitter_ms=10)
+SCENARIOS = {
+    "healthy": {"frankfurter": OK, "exhost": OK, "weatherapi": OK},
+    "slow": {p: StubBehavior(latency_ms=400, jitter_ms=300) for p in ("frankfurter", "exhost", "weatherapi")},
+    "flaky": {
+        "frankfurter": StubBehavior(latency_ms=40, jitter_ms=20, error_rate=0.3),
+        "exhost": StubBehavior(latency_ms=60, jitter_ms=20, error_rate=0.2),
+        "weatherapi": StubBehavior(latency_ms=40, jitter_ms=20, error_rate=0.15),
+    },
+    "timeouts": {
+        "frankfurter": StubBehavior(latency_ms=40, jitter_ms=20, timeout_rate=0.2),
+        "exhost": StubBehavior(latency_ms=60, jitter_ms=20, timeout_rate=0.1),
+        "weatherapi": StubBehavior(latency_ms=40, jitter_ms=20, timeout_rate=0.1),
+    },
+    "frankfurter_down": {
+        "frankfurter": StubBehavior(latency_ms=5, error_rate=1.0),
+        "exhost": OK,
+        "weatherapi": OK,
+    },
+    "all_down": {p: StubBehavior(latency_ms=5, error_rate=1.0) for p in ("frankfurter", "exhost", "weatherapi")},
+}
+
+_reply = threading.local()
+
+
+def _capture_speak(text: str, outfile=None):
+    _reply.text = text
+
+
+def _configure(stubs, timeout_sec: float):
+    urls = provider_urls(stubs)
+    fxapi_en.FRANKFURTER_BASE_URLS = urls["FX_FRANKFURTER_URLS"].split(",")
+    fxapi_en.EXHOST_BASE_URL = urls["FX_EXHOST_URL"]
+    fxapi_en.FX_TIMEOUT_SEC = timeout_sec
+    fxapi_en.DEBUG = False
+    weatherapi_en.WEATHERAPI_BASE_URL = urls["WEATHERAPI_BASE_URL"]
+    weatherapi_en.WEATHERAPI_TIMEOUT_SEC = timeout_sec
+    # TTS 대신 응답 문장만 수집
+    fxapi_en.speak_en = _capture_speak
+    weatherapi_en.speak_en = _capture_speak
+
+
+def _one(kind: str, q: str):
+    _reply.text = None
+    t0 = time.perf_counter()
+    if kind == "fx":
+        fxapi_en.handle_fx_query(q)
+    else:
+        weatherapi_en.handle_weather_query(q)
+    dt = time.perf_counter() - t0
+    text = _reply.text or ""
+    ok = bool(text) and not any(p in text for p in FAILURE_REPLIES)
+    return kind, dt, ok
+
+
+def _pct(xs, p):
+    if not xs:
+        return float("nan")
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+
+def run_scenario(name: str, stubs, n: int, concurrency: int):
+    for p, b in SCENARIOS[name].items():
+        stubs[p].set_behavior(b)
+    jobs = []
+    for i in range(n):
+        if i % 2 == 0:
+            jobs.append(("fx", FX_QUERIES[(i // 2) % len(FX_QUERIES)]))
+        else:
+            jobs.append(("weather", WEATHER_QUERIES[(i // 2) % len(WEATHER_QUERIES)]))
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # 핸들러 로그 숨김
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            results = list(ex.map(lambda j: _one(*j), jobs))
+    wall = time.perf_counter() - t0
+
+    rows = []
+    for kind in ("fx", "weather"):
+        lat = [dt for k, dt, _ in results if k == kind]
+        ok = sum(1 for k, _, s in results if k == kind and s)
+        rows.append((kind, len(lat), _pct(lat, 50) * 1000, _pct(lat, 99) * 1000, ok / max(len(lat), 1) * 100))
+    return wall, rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load/latency benchmark for the FX / weather fetch layer")
+    ap.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="default: all")
+    ap.add_argument("-n", "--requests", type=int, default=200, help="queries per scenario (half fx, half weather)")
+    ap.add_argument("-c", "--concurrency", type=int, default=16)
+    ap.add_argument("--timeout", type=float, default=1.0, help="client timeout (s) for both providers")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    stubs = start_stubs(seed=args.seed)
+    for s in stubs.values():
+        s.set_behavior(StubBehavior(hang_sec=args.timeout + 1.0))
+    _configure(stubs, args.timeout)
+
+    print(f"{'scenario':18s} {'kind':8s} {'n':>5s} {'p50 ms':>9s} {'p99 ms':>9s} {'success':>8s} {'wall s':>7s}")
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            for b in SCENARIOS[name].values():
+                b.hang_sec = args.timeout + 1.0
+            wall, rows = run_scenario(name, stubs, args.requests, args.concurrency)
+            for kind, n, p50, p99, succ in rows:
+                print(f"{name:18s} {kind:8s} {n:5d} {p50:9.1f} {p99:9.1f} {succ:7.1f}% {wall:7.2f}")
+    finally:
+        for s in stubs.values():
+            s.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# bt_sink_supervisor.py
+# bt_auto_connect.sh 의 폴링 루프(bluetoothctl info 5초 x 60회, pactl list 1초 x 15회)를 대체하는
+# 상주 감시 프로세스. `pactl subscribe` 로 sink 추가/삭제 이벤트를 받아
+# - 블루투스 sink 가 나타나는 즉시 기본 출력으로 전환 (재생 중 스트림도 이동)
+# - 연결이 끊기면 백오프를 두고 bluetoothctl connect 재시도 (ASR 프로세스는 그대로 유지)
+# - 상태 안내는 미리 렌더링해 둔 mp3 캐시로 재생 (say 마다 파이썬/gTTS 실행하지 않음)
+import argparse
+import hashlib
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+# ===== 사용자 설정 =====
+BT_DEVICE_MAC = "00:02:3C:C7:05:7A"       # Pebble V3 MAC 주소
+BT_SINK_PREFIX = "bluez_output"
+PROMPT_DIR = os.path.expanduser("~/work/bt_prompts")
+PROMPT_LANG = "ko"
+PROMPTS = {
+    "waiting": "스피커가 다른 기기와 연결 중입니다. 연결을 대기합니다.",
+    "connected": "스피커에 연결되었습니다.",
+    "lost": "스피커 연결이 끊겼습니다. 다시 연결합니다.",
+    "failed": "스피커를 연결할 수 없습니다. 계속 재시도합니다.",
+}
+RECONNECT_BACKOFF_SEC = [1, 2, 3, 5, 10]   # 재연결 시도 간격 (마지막 값 반복)
+GIVE_UP_NOTICE_SEC = 300                   # 이 시간 동안 실패하면 "failed" 안내 1회
+
+DEBUG = True
+
+def bt_debug(*args):
+    if DEBUG:
+        print("[BT]", *args, flush=True)
+
+RE_SINK_EVENT = re.compile(r"Event '(?P<kind>new|remove|change)' on sink #(?P<idx>\d+)")
+# 백엔드가 재구독 직후 흘려보내는 표시 — 끊긴 동안 놓친 이벤트가 있을 수 있으니 sink 목록을 다시 확인
+RESYNC_EVENT = "[resync]"
+
+
+# ------------------- 안내 음성 캐시 -------------------
+class PromptCache:
+    """텍스트 → mp3 경로. 최초 1회만 gTTS 로 렌더링하고 이후에는 파일 재사용."""
+
+    def __init__(self, directory=PROMPT_DIR, lang=PROMPT_LANG, render=True):
+        self.directory = directory
+        self.lang = lang
+        self.render = render
+
+    def path(self, text: str) -> str:
+        key = hashlib.sha1(f"{self.lang}:{text}".encode("utf-8")).hexdigest()[:16]
+        out = os.path.join(self.directory, f"{key}.mp3")
+        if self.render and not os.path.exists(out):
+            from gtts import gTTS
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = out + ".tmp"
+            gTTS(text, lang=self.lang).save(tmp)
+            os.replace(tmp, out)
+        return out
+
+    def warm(self, texts):
+        for t in texts:
+            try:
+                self.path(t)
+            except Exception as e:
+                bt_debug("prompt render failed:", repr(e))
+
+
+# ------------------- 백엔드 -------------------
+class PactlBackend:
+    """실제 PulseAudio/PipeWire(pactl) + bluetoothctl 백엔드."""
+
+    def events(self):
+        # pactl subscribe 가 죽으면(오디오 서버 재시작 등) 잠시 후 다시 구독
+        while True:
+            proc = subprocess.Popen(["pactl", "subscribe"], stdout=subprocess.PIPE, text=True)
+            try:
+                for line in proc.stdout:
+                    yield line.strip()
+            finally:
+                proc.kill()
+            bt_debug("pactl subscribe exited; resubscribing")
+            time.sleep(1.0)
+            yield RESYNC_EVENT
+
+    def list_sinks(self):
+        out = subprocess.run(["pactl", "list", "short", "sinks"], capture_output=True, text=True).stdout
+        sinks = []
+        for line in out.splitlines():
+            cols = line.split("\t")
+            if len(cols) >= 2:
+                sinks.append((cols[0], cols[1]))
+        return sinks
+
+    def set_default_sink(self, name: str):
+        subprocess.run(["pactl", "set-default-sink", name])
+        # 이미 재생 중인 스트림도 새 sink 로 이동
+        out = subprocess.run(["pactl", "list", "short", "sink-inputs"], capture_output=True, text=True).stdout
+        for line in out.splitlines():
+            sid = line.split("\t")[0]
+            if sid:
+                subprocess.run(["pactl", "move-sink-input", sid, name])
+
+    def connect(self, mac: str) -> bool:
+        try:
+            r = subprocess.run(["bluetoothctl", "connect", mac], capture_output=True, text=True, timeout=15)
+        except subprocess.TimeoutExpired:
+            return False
+        return "Connection successful" in r.stdout
+
+    def play(self, path: str):
+        subprocess.run(["mpg123", "-q", path])
+
+
+class StandInBackend:
+    """
+    테스트용 로컬 이벤트 소스. pactl subscribe 와 같은 형식의 줄을 큐로 흘려보낸다.
+    - connect(): connect_delay 후 bluez sink 가 생성됨 (fail_connects 만큼은 실패)
+    - drop(): 현재 bluez sink 제거 이벤트 발생
+    - restart_server(): 오디오 서버 재시작 흉내 — 이벤트 없이 bluez sink 가 사라지고 재구독 표시만 전달
+    """
+
+    def __init__(self, connect_delay=0.3, fail_connects=0):
+        self.connect_delay = connect_delay
+        self.fail_connects = fail_connects
+        self._q = queue.Queue()
+        self._sinks = {"0": "alsa_output.platform-bcm2835_audio.analog-stereo"}
+        self._next_idx = 1
+        self._lock = threading.Lock()
+        self.default_sink = None
+        self.played = []
+
+    def events(self):
+        while True:
+            line = self._q.get()
+            if line is None:
+                return
+            yield line
+
+    def close(self):
+        self._q.put(None)
+
+    def list_sinks(self):
+        with self._lock:
+            return sorted(self._sinks.items())
+
+    def set_default_sink(self, name: str):
+        self.default_sink = name
+
+    def connect(self, mac: str) -> bool:
+        time.sleep(self.connect_delay)
+        with self._lock:
+            if self.fail_connects > 0:
+                self.fail_connects -= 1
+                return False
+            if any(n.startswith(BT_SINK_PREFIX) for n in self._sinks.values()):
+                return True
+            idx = str(self._next_idx)
+            self._next_idx += 1
+            self._sinks[idx] = f"{BT_SINK_PREFIX}.{mac.replace(':', '_')}.1"
+        self._q.put(f"Event 'new' on sink #{idx}")
+        return True
+
+    def drop(self):
+        with self._lock:
+            idx = next((i for i, n in self._sinks.items() if n.startswith(BT_SINK_PREFIX)), None)
+            if idx is None:
+                return
+            del self._sinks[idx]
+        self._q.put(f"Event 'remove' on sink #{idx}")
+
+    def restart_server(self):
+        with self._lock:
+            for i in [i for i, n in self._sinks.items() if n.startswith(BT_SINK_PREFIX)]:
+                del self._sinks[i]
+        self._q.put(RESYNC_EVENT)
+
+    def play(self, path: str):
+        self.played.append(path)
+
+
+# ------------------- 감시자 -------------------
+class SinkSupervisor:
+    def __init__(self, backend, mac=BT_DEVICE_MAC, prompts: PromptCache | None = None):
+        self.backend = backend
+        self.mac = mac
+        self.prompts = prompts or PromptCache()
+        self.bt_sink = None            # (index, name)
+        self.lost_at = None            # 끊긴(또는 시작) 시각 → time-to-audio 측정 기준
+        self.time_to_audio = []        # 재연결마다 기록 (초)
+        self._connected = threading.Event()
+        self._stop = threading.Event()
+        self._reconnecting = False
+        self._lock = threading.Lock()
+
+    # --- 안내 ---
+    def say(self, key: str):
+        text = PROMPTS[key]
+        bt_debug("Speaking:", text)
+        try:
+            self.backend.play(self.prompts.path(text))
+        except Exception as e:
+            bt_debug("prompt failed:", repr(e))
+
+    # --- sink 채택 ---
+    def _adopt(self, idx: str, name: str):
+        with self._lock:
+            if self.bt_sink and self.bt_sink[0] == idx:
+                return
+            self.bt_sink = (idx, name)
+        self.backend.set_default_sink(name)
+        self._connected.set()
+        bt_debug(f"Sink ready: #{idx} {name} (default)")
+        if self.lost_at is not None:
+            dt = time.monotonic() - self.lost_at
+            self.time_to_audio.append(dt)
+            bt_debug(f"time-to-audio: {dt:.2f} s")
+            self.lost_at = None
+        self.say("connected")
+
+    def _find_bt_sink(self):
+        # --mac 로 지정한 기기의 sink 만 (폰/헤드셋 등 다른 블루투스 기기가 출력을 가져가지 않게)
+        # 예: bluez_output.00_02_3C_C7_05_7A.1
+        mac_key = self.mac.replace(":", "_").lower()
+        for idx, name in self.backend.list_sinks():
+            if name.startswith(BT_SINK_PREFIX) and mac_key in name.lower():
+                return idx, name
+        return None
+
+    # --- 이벤트 처리 ---
+    def _lose_sink(self, idx: str):
+        self._connected.clear()
+        self.lost_at = time.monotonic()
+        bt_debug(f"Sink #{idx} removed — reconnecting")
+        self.say("lost")
+        self._start_reconnect()
+
+    def resync(self):
+        """재구독 후 상태 재확인: start() 와 같이 sink 가 있으면 채택, 없어졌으면 재연결."""
+        found = self._find_bt_sink()
+        if found:
+            self._adopt(*found)
+            return
+        with self._lock:
+            lost = self.bt_sink
+            self.bt_sink = None
+        if lost:
+            self._lose_sink(lost[0])
+        elif not self._connected.is_set():
+            self._start_reconnect()
+
+    def handle_event(self, line: str):
+        if line == RESYNC_EVENT:
+            bt_debug("resubscribed — resyncing sink state")
+            self.resync()
+            return
+        m = RE_SINK_EVENT.search(line)
+        if not m:
+            return
+        kind, idx = m.group("kind"), m.group("idx")
+        if kind == "new":
+            found = self._find_bt_sink()
+            if found and found[0] == idx:
+                self._adopt(*found)
+        elif kind == "remove":
+            with self._lock:
+                if not (self.bt_sink and self.bt_sink[0] == idx):
+                    return
+                self.bt_sink = None
+            self._lose_sink(idx)
+
+    # --- 재연결 ---
+    def _start_reconnect(self):
+        with self._lock:
+            if self._reconnecting:
+                return
+            self._reconnecting = True
+        threading.Thread(target=self._reconnect_loop, daemon=True).start()
+
+    def _reconnect_loop(self):
+        started = time.monotonic()
+        attempt = 0
+        noticed = False
+        try:
+            while not self._stop.is_set() and not self._connected.is_set():
+                bt_debug(f"connect {self.mac} (attempt {attempt + 1})")
+                ok = self.backend.connect(self.mac)
+                # sink 생성은 이벤트로 통보되므로 여기서는 대기만 한다 (폴링 없음)
+                wait = RECONNECT_BACKOFF_SEC[min(attempt, len(RECONNECT_BACKOFF_SEC) - 1)]
+                if self._connected.wait(wait if not ok else max(wait, 5)):
+                    break
+                attempt += 1
+                if attempt == 1 and not self.time_to_audio:  # 최초 연결 대기 시 1회
+                    self.say("waiting")
+                if not noticed and time.monotonic() - started > GIVE_UP_NOTICE_SEC:
+                    self.say("failed")
+                    noticed = True
+        finally:
+            with self._lock:
+                self._reconnecting = False
+
+    def start(self):
+        self.lost_at = time.monotonic()
+        found = self._find_bt_sink()
+        if found:
+            self._adopt(*found)
+        else:
+            self._start_reconnect()
+
+    def run(self):
+        self.start()
+        for line in self.backend.events():
+            if self._stop.is_set():
+                break
+            self.handle_event(line)
+
+    def stop(self):
+        self._stop.set()
+
+
+def run_stand_in(drops=3):
+    """로컬 스탠드인 이벤트 소스로 연결 → 끊김 → 재연결 시나리오를 돌리고 time-to-audio 를 보고."""
+    backend = StandInBackend(connect_delay=0.3, fail_connects=1)
+    sup = SinkSupervisor(backend, prompts=PromptCache(directory="/tmp/bt_prompts", render=False))
+    t = threading.Thread(target=sup.run, daemon=True)
+    t.start()
+    for _ in range(drops + 1):
+        if not sup._connected.wait(30):
+            bt_debug("stand-in: did not connect")
+            break
+        time.sleep(0.5)
+        backend.drop()
+        time.sleep(0.1)
+    sup._connected.wait(30)
+    sup.stop()
+    backend.close()
+    t.join(timeout=2)
+    tta = sup.time_to_audio
+    if tta:
+        bt_debug(f"stand-in: {len(tta)} connects, time-to-audio "
+                 f"min {min(tta):.2f} s / max {max(tta):.2f} s / avg {sum(tta) / len(tta):.2f} s")
+    return tta
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bluetooth audio sink supervisor")
+    ap.add_argument("--mac", default=BT_DEVICE_MAC)
+    ap.add_argument("--stand-in", action="store_true", help="run against the local stand-in event source")
+    args = ap.parse_args()
+
+    if args.stand_in:
+        run_stand_in()
+        return
+
+    prompts = PromptCache()
+    prompts.warm(PROMPTS.values())
+    sup = SinkSupervisor(PactlBackend(), mac=args.mac, prompts=prompts)
+    try:
+        sup.run()
+    except KeyboardInterrupt:
+        sup.stop()
+        bt_debug("Stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# confidence_eval.py
+# 라벨링한 인식 결과 코퍼스로 confidence_gate 임계값을 오프라인 평가/탐색한다.
+#
+# 코퍼스: ASR_LOG_PATH 로 남긴 JSONL 에 "label" 을 붙인 것
+#   {"text": "weather in tokyo", "ctx": "default", "result": [{"word": "weather", "conf": 0.98}, ...], "label": "accept"}
+#   label: "accept" = 실제 명령(처리돼야 함) / "reject" = 잡음·에코·오인식(처리되면 안 됨)
+#
+#   python confidence_eval.py corpus.jsonl             # 현재 기본값 평가 + 격자 탐색 상위 10개
+#   python confidence_eval.py corpus.jsonl --top 20 --w-confirm 0.2
+import argparse
+import json
+from itertools import product
+
+from confidence_gate import DEFAULT_THRESHOLDS, GateThresholds, expected_fetches, gate
+from voice_router import route_domain
+
+
+def load_corpus(path: str):
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if rec.get("label") not in ("accept", "reject"):
+                continue
+            domain = route_domain(rec.get("text", ""))
+            if domain == "unknown" and rec.get("ctx") in ("fx", "weather"):
+                domain = rec["ctx"]
+            if domain == "unknown":
+                continue
+            rec["domain"] = domain
+            records.append(rec)
+    return records
+
+
+def evaluate(records, th: GateThresholds) -> dict:
+    m = {k: 0 for k in ("good_accept", "good_confirm", "good_drop",
+                        "bad_accept", "bad_confirm", "bad_drop",
+                        "fetches_saved", "tts_saved")}
+    for rec in records:
+        decision, info = gate(rec["domain"], rec.get("result"), th)
+        kind = "good" if rec["label"] == "accept" else "bad"
+        m[f"{kind}_{decision}"] += 1
+        if decision == "drop":
+            m["fetches_saved"] += expected_fetches(rec["domain"], info["slots"])
+            m["tts_saved"] += 1
+    n_good = m["good_accept"] + m["good_confirm"] + m["good_drop"]
+    n_bad = m["bad_accept"] + m["bad_confirm"] + m["bad_drop"]
+    m["false_reject_rate"] = m["good_drop"] / n_good if n_good else 0.0
+    m["false_accept_rate"] = m["bad_accept"] / n_bad if n_bad else 0.0
+    m["confirm_rate"] = (m["good_confirm"] + m["bad_confirm"]) / max(len(records), 1)
+    return m
+
+
+def cost(m: dict, w_fa: float, w_fr: float, w_confirm: float) -> float:
+    # 잡음이 처리됨(FA) / 진짜 명령이 버려짐(FR) / 확인 질문(사용자 한 턴 추가)
+    return w_fa * m["bad_accept"] + w_fr * m["good_drop"] + w_confirm * (m["good_confirm"] + m["bad_confirm"])
+
+
+def _grid():
+    steps = [round(0.30 + 0.05 * i, 2) for i in range(12)]   # 0.30 ~ 0.85
+    for utt, sd, sc in product(steps, steps, steps):
+        if sd <= sc:
+            yield GateThresholds(utterance_drop=utt, slot_drop=sd, slot_confirm=sc)
+
+
+def _row(th: GateThresholds, m: dict, c: float) -> str:
+    return (f"utt<{th.utterance_drop:.2f} slot<{th.slot_drop:.2f} confirm<{th.slot_confirm:.2f} | "
+            f"FA {m['false_accept_rate'] * 100:5.1f}%  FR {m['false_reject_rate'] * 100:5.1f}%  "
+            f"confirm {m['confirm_rate'] * 100:5.1f}% | saved fetch={m['fetches_saved']} tts={m['tts_saved']} "
+            f"| cost {c:.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline evaluation of confidence_gate thresholds")
+    ap.add_argument("corpus", help="labelled JSONL (see header)")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--w-fa", type=float, default=1.0, help="cost of running a noise/misheard command")
+    ap.add_argument("--w-fr", type=float, default=2.0, help="cost of dropping a real command")
+    ap.add_argument("--w-confirm", type=float, default=0.3, help="cost of an extra confirmation turn")
+    args = ap.parse_args()
+
+    records = load_corpus(args.corpus)
+    n_good = sum(1 for r in records if r["label"] == "accept")
+    print(f"[Eval] {len(records)} utterances ({n_good} commands, {len(records) - n_good} noise)")
+
+    m = evaluate(records, DEFAULT_THRESHOLDS)
+    print("[Eval] current :", _row(DEFAULT_THRESHOLDS, m, cost(m, args.w_fa, args.w_fr, args.w_confirm)))
+
+    scored = []
+    for th in _grid():
+        m = evaluate(records, th)
+        scored.append((cost(m, args.w_fa, args.w_fr, args.w_confirm), th, m))
+    scored.sort(key=lambda x: (x[0], -x[2]["fetches_saved"]))
+    for i, (c, th, m) in enumerate(scored[:args.top], 1):
+        print(f"[Eval] #{i:<2d}    :", _row(th, m, c))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# confidence_gate.py
+# Vosk 단어별 confidence(rec.SetWords(True) → result["result"])로
+# 발화 점수 / 핵심 슬롯(통화, 도시) 점수를 계산해, HTTP 요청·TTS 전에
+#   accept  : 그대로 처리
+#   confirm : "Did you say ...?" 로 확인 후 처리
+#   drop    : 조용히 버림 (TV 소리, 에코 등)
+# 을 결정한다. voice_router 와 confidence_eval(오프라인 평가)이 같이 사용.
+import os
+import re
+from dataclasses import dataclass
+
+from fxapi_en import _norm_ccy
+from weatherapi_en import CITY_ALIASES
+
+YES_WORDS = {"yes", "yeah", "yep", "correct", "right"}
+NO_WORDS = {"no", "nope", "wrong"}
+
+
+@dataclass
+class GateThresholds:
+    utterance_drop: float = 0.55   # 발화 평균 conf 가 이보다 낮으면 drop
+    slot_drop: float = 0.45        # 핵심 슬롯 conf 가 이보다 낮으면 drop
+    slot_confirm: float = 0.75     # 핵심 슬롯 conf 가 이보다 낮으면 confirm
+
+
+DEFAULT_THRESHOLDS = GateThresholds(
+    utterance_drop=float(os.environ.get("GATE_UTT_DROP", GateThresholds.utterance_drop)),
+    slot_drop=float(os.environ.get("GATE_SLOT_DROP", GateThresholds.slot_drop)),
+    slot_confirm=float(os.environ.get("GATE_SLOT_CONFIRM", GateThresholds.slot_confirm)),
+)
+
+# 처리하지 않아서 아낀 작업량 (라우터가 누적, 주기적으로 출력)
+GATE_STATS = {
+    "accepted": 0,
+    "confirm_asked": 0,
+    "confirmed": 0,
+    "dropped": 0,
+    "fetches_saved": 0,
+    "tts_saved": 0,
+}
+
+# 여러 단어 도시명 ("new york", "miya zaki") 도 한 슬롯으로
+_CITY_KEYS = sorted(CITY_ALIASES, key=lambda k: -len(k.split()))
+
+
+def _words(result_words):
+    """Vosk result 항목 → [(word, conf)] ([unk] 제외)."""
+    out = []
+    for w in result_words or []:
+        word = str(w.get("word", "")).lower()
+        if word and word != "[unk]":
+            out.append((word, float(w.get("conf", 1.0))))
+    return out
+
+
+def utterance_score(result_words) -> float | None:
+    ws = _words(result_words)
+    if not ws:
+        return None
+    return sum(c for _, c in ws) / len(ws)
+
+
+def slot_scores(domain: str, result_words) -> list[tuple[str, float]]:
+    """핵심 슬롯별 점수 = 슬롯을 이루는 단어 conf 의 최솟값."""
+    ws = _words(result_words)
+    toks = [w for w, _ in ws]
+    slots = []
+    if domain == "fx":
+        for w, c in ws:
+            if _norm_ccy(w):
+                slots.append((w, c))
+    elif domain == "weather":
+        i = 0
+        while i < len(toks):
+            for key in _CITY_KEYS:
+                parts = key.split()
+                if toks[i:i + len(parts)] == parts:
+                    slots.append((key, min(c for _, c in ws[i:i + len(parts)])))
+                    i += len(parts) - 1
+                    break
+            i += 1
+    return slots
+
+
+def expected_fetches(domain: str, slots) -> int:
+    """drop/거절 시 아끼게 되는 업스트림 요청 수 (대략)."""
+    if domain == "weather":
+        return max(1, len({CITY_ALIASES.get(s, s) for s, _ in slots}))
+    return 1
+
+
+def gate(domain: str, result_words, th: GateThresholds = DEFAULT_THRESHOLDS):
+    """
+    반환: (decision, info)
+      decision: "accept" | "confirm" | "drop"
+      info: {"utterance": float|None, "slots": [(slot, conf)], "weakest": (slot, conf)|None}
+    단어 정보가 없으면(confidence 미제공) 항상 accept.
+    """
+    utt = utterance_score(result_words)
+    slots = slot_scores(domain, result_words)
+    weakest = min(slots, key=lambda s: s[1]) if slots else None
+    info = {"utterance": utt, "slots": slots, "weakest": weakest}
+    if utt is None:
+        return "accept", info
+    if utt < th.utterance_drop:
+        return "drop", info
+    if weakest is not None:
+        if weakest[1] < th.slot_drop:
+            return "drop", info
+        if weakest[1] < th.slot_confirm:
+            return "confirm", info
+    return "accept", info
+
+
+def confirm_prompt(domain: str, info) -> str:
+    slot = info["weakest"][0] if info.get("weakest") else None
+    if domain == "weather" and slot:
+        return f"Did you say {CITY_ALIASES.get(slot, slot)}?"
+    if slot:
+        return f"Did you say {slot}?"
+    return "Sorry, could you say that again?"
+
+
+def is_no(q: str) -> bool:
+    return bool(set(re.findall(r"[a-z]+", q.lower())) & NO_WORDS)
+
+
+def is_yes(q: str) -> bool:
+    """예 토큰이 있고 아니오 토큰이 하나도 없을 때만 yes ("no ... right" 는 yes 아님)."""
+    return bool(set(re.findall(r"[a-z]+", q.lower())) & YES_WORDS) and not is_no(q)
+
+
+def stats_line() -> str:
+    s = GATE_STATS
+    return (f"accepted={s['accepted']} dropped={s['dropped']} confirm={s['confirm_asked']}"
+            f"/{s['confirmed']} saved: fetch={s['fetches_saved']} tts={s['tts_saved']}")
@@ -1,4 +1,5 @@
 # fxapi_en.py
+import os
 import re
 import requests
 import time
@@ -12,8 +13,13 @@ def fx_debug(*args):
     if DEBUG:
         print("[FX]", *args)
 
-# Frankfurter 기본 (우선 시도)
-FRANKFURTER_DOMAINS = ["api.frankfurter.dev", "api.frankfurter.app"]
+# Frankfurter 기본 (우선 시도) — 환경변수로 교체 가능 (로컬 스텁 서버 / 벤치마크용)
+FRANKFURTER_BASE_URLS = os.environ.get(
+    "FX_FRANKFURTER_URLS", "https://api.frankfurter.dev,https://api.frankfurter.app"
+).split(",")
+# exchangerate.host 폴백
+EXHOST_BASE_URL = os.environ.get("FX_EXHOST_URL", "https://api.exchangerate.host")
+FX_TIMEOUT_SEC = float(os.environ.get("FX_TIMEOUT_SEC", "4.0"))
 
 # 사용자 축약/별칭 → ISO 코드
 ALIASES = {
@@ -62,13 +68,72 @@ RE_AMOUNT_FROM_TO = re.compile(
 )
 
 # 자유형 파서용
-FILLERS = {"currency", "exchange", "rate", "rates", "hello", "there", "the"}
+FILLERS = {"currency", "exchange", "rate", "rates", "hello", "there", "the", "convert"}
 CONNECTORS = {"to", "in", "into"}
+TARGET_JOINERS = {"and"}  # "to yen, won and canadian"
 
 def _norm_ccy(tok: str) -> str | None:
     t = tok.strip().lower()
+    if t not in ALIASES and t.endswith("s") and t[:-1] in ALIASES:
+        t = t[:-1]  # dollars → dollar
     return ALIASES.get(t) or (t.upper() if t.upper() in {"KRW","JPY","USD","CAD"} else None)
 
+# 음성 금액("one hundred fifty dollars") → 숫자("150 dollars"): 정규식/토큰 파서는 숫자만 인식
+_NUM_UNITS = {w: i for i, w in enumerate(
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen "
+    "fifteen sixteen seventeen eighteen nineteen".split())}
+_NUM_TENS = {w: 10 * i for i, w in enumerate("twenty thirty forty fifty sixty seventy eighty ninety".split(), 2)}
+_NUM_SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+NUMBER_WORDS = list(_NUM_UNITS) + list(_NUM_TENS) + list(_NUM_SCALES) + ["point"]
+
+def _number_value(words: list[str]) -> float:
+    total, cur, frac = 0, 0, None
+    for w in words:
+        if w == "point":
+            frac = ""
+        elif frac is not None:
+            frac += str(_NUM_UNITS.get(w, 0))
+        elif w in _NUM_UNITS or w in _NUM_TENS:
+            cur += _NUM_UNITS.get(w) or _NUM_TENS.get(w, 0)
+        elif w == "hundred":
+            cur = max(cur, 1) * 100
+        else:
+            total += max(cur, 1) * _NUM_SCALES[w]
+            cur = 0
+    value = total + cur
+    return value + float("0." + frac) if frac else value
+
+def words_to_digits(s: str) -> str:
+    """
+    "convert one hundred fifty dollars to yen" → "convert 150 dollars to yen"
+    문법에 숫자 단어가 들어가면서 생기는 동음이의 오인식은 문맥으로 되돌림:
+    - 통화가 뒤따르지 않는 한 단어 "one" → "won" ("yen to one")
+    - 통화/금액과 통화 사이의 한 단어 "two" / "four" → "to" ("100 dollars two yen", "dollars four yen")
+    - "rate(s)" 바로 뒤 한 단어 "four" → "for" ("exchange rate four yen to won")
+    """
+    toks = s.split()
+    out, run = [], []
+    for i, t in enumerate(toks + [""]):
+        if t.lower() in NUMBER_WORDS and not (t.lower() == "point" and not run):
+            run.append(t.lower())
+            continue
+        if run:
+            prev = out[-1].lower() if out else ""
+            after_slot = bool(_norm_ccy(prev)) or bool(re.fullmatch(r"\d+(?:\.\d+)?", prev))
+            if run == ["one"] and not _norm_ccy(t):
+                out.append("won")
+            elif run in (["two"], ["four"]) and after_slot and _norm_ccy(t):
+                out.append("to")
+            elif run == ["four"] and prev in ("rate", "rates"):
+                out.append("for")
+            else:
+                v = _number_value(run)
+                out.append(f"{v:g}" if isinstance(v, float) else str(v))
+            run = []
+        if t:
+            out.append(t)
+    return " ".join(out)
+
 def _tokenize(s: str):
     return re.findall(r"[A-Za-z]+|\d+(?:\.\d+)?", s.lower())
 
@@ -111,13 +176,48 @@ def infer_pair_freeform(s: str):
 
     return (None, None)
 
+def infer_multi_targets(s: str):
+    """
+    "convert 100 dollars to yen, won and canadian" → (100.0, "USD", ["JPY", "KRW", "CAD"])
+    - 연결어 앞 마지막 통화가 base, 뒤의 통화들이 targets (중복/같은 통화 제외)
+    - "canadian dollar" 처럼 CAD/USD 토큰 바로 뒤의 dollar 는 수식어로 보고 건너뜀
+    연결어가 없으면 (None, None, [])
+    """
+    tokens = _tokenize(s)
+    conn_idx = next((i for i, t in enumerate(tokens) if t in CONNECTORS), None)
+    if conn_idx is None:
+        return (None, None, [])
+
+    amount = None
+    base = None
+    targets = []
+    prev_code = None
+    for i, t in enumerate(tokens):
+        if i < conn_idx and amount is None and re.fullmatch(r"\d+(?:\.\d+)?", t):
+            amount = float(t)
+            prev_code = None
+            continue
+        code = None if t in FILLERS else _norm_ccy(t)
+        if code is None:
+            prev_code = None
+            continue
+        if t.startswith("dollar") and prev_code in ("CAD", "USD"):
+            continue  # "canadian dollars", "us dollar"
+        prev_code = code
+        if i < conn_idx:
+            base = code
+        elif code != base and code not in targets:
+            targets.append(code)
+    return (amount, base, targets)
+
 # ------------------- 환율 호출 -------------------
-def _fetch_rate_once_frankfurter(domain: str, base: str, target: str, amount: float | None, timeout_sec: float):
+# 여러 대상 통화를 요청 1회로 가져온다 (Frankfurter: to=JPY,KRW,CAD / exchangerate.host: symbols=...)
+def _fetch_rates_once_frankfurter(base_url: str, base: str, targets: list[str], amount: float | None, timeout_sec: float):
     params = []
     if amount is not None:
         params.append(f"amount={amount}")
-    params += [f"from={base}", f"to={target}"]
-    url = f"https://{domain}/latest?" + "&".join(params)
+    params += [f"from={base}", f"to={','.join(targets)}"]
+    url = f"{base_url}/latest?" + "&".join(params)
     fx_debug("GET", url)
     r = requests.get(url, timeout=timeout_sec)
     status = r.status_code
@@ -125,16 +225,17 @@ def _fetch_rate_once_frankfurter(domain: str, base: str, target: str, amount: fl
         data = r.json()
     except Exception:
         data = {"_raw": r.text}
-    fx_debug(f"{domain} -> HTTP {status}")
+    fx_debug(f"{base_url} -> HTTP {status}")
     if status != 200:
-        raise RuntimeError(f"Frankfurter {domain} HTTP {status} data={data}")
-    if "rates" not in data or target not in data["rates"]:
-        raise RuntimeError(f"Frankfurter {domain} missing rate for {target}: {data}")
-    return float(data["rates"][target])
+        raise RuntimeError(f"Frankfurter {base_url} HTTP {status} data={data}")
+    missing = [t for t in targets if t not in data.get("rates", {})]
+    if missing:
+        raise RuntimeError(f"Frankfurter {base_url} missing rate for {missing}: {data}")
+    return {t: float(data["rates"][t]) for t in targets}
 
-def _fetch_rate_once_exhost(base: str, target: str, amount: float | None, timeout_sec: float):
+def _fetch_rates_once_exhost(base: str, targets: list[str], amount: float | None, timeout_sec: float):
     amt = amount if amount is not None else 1
-    url = f"https://api.exchangerate.host/convert?from={base}&to={target}&amount={amt}"
+    url = f"{EXHOST_BASE_URL}/latest?base={base}&symbols={','.join(targets)}&amount={amt}"
     fx_debug("GET", url)
     r = requests.get(url, timeout=timeout_sec)
     status = r.status_code
@@ -145,21 +246,26 @@ def _fetch_rate_once_exhost(base: str, target: str, amount: float | None, timeou
     fx_debug(f"exchangerate.host -> HTTP {status}")
     if status != 200 or data.get("success") is False:
         raise RuntimeError(f"exchangerate.host HTTP {status} data={data}")
-    return float(data.get("result"))
+    missing = [t for t in targets if t not in data.get("rates", {})]
+    if missing:
+        raise RuntimeError(f"exchangerate.host missing rate for {missing}: {data}")
+    return {t: float(data["rates"][t]) for t in targets}
 
-def _fetch_rate(base: str, target: str, amount: float | None, timeout_sec=4.0, retries=1):
+def _fetch_rates(base: str, targets: list[str], amount: float | None, timeout_sec=None, retries=1):
+    if timeout_sec is None:
+        timeout_sec = FX_TIMEOUT_SEC
     last_exc = None
     for _ in range(retries + 1):
         # Frankfurter .dev → .app
-        for dom in FRANKFURTER_DOMAINS:
+        for base_url in FRANKFURTER_BASE_URLS:
             try:
-                return _fetch_rate_once_frankfurter(dom, base, target, amount, timeout_sec)
+                return _fetch_rates_once_frankfurter(base_url, base, targets, amount, timeout_sec)
             except Exception as e:
                 fx_debug("Frankfurter fail:", repr(e))
                 last_exc = e
         # exchangerate.host 폴백
         try:
-            return _fetch_rate_once_exhost(base, target, amount, timeout_sec)
+            return _fetch_rates_once_exhost(base, targets, amount, timeout_sec)
         except Exception as e3:
             fx_debug("exchangerate.host fail:", repr(e3))
             last_exc = e3
@@ -167,7 +273,19 @@ def _fetch_rate(base: str, target: str, amount: float | None, timeout_sec=4.0, r
     fx_debug("fetch failed:", repr(last_exc))
     raise last_exc
 
+def _fetch_rate(base: str, target: str, amount: float | None, timeout_sec=None, retries=1):
+    return _fetch_rates(base, [target], amount, timeout_sec=timeout_sec, retries=retries)[target]
+
 # ------------------- 응답 포맷 -------------------
+def _fmt_value(x: float) -> str:
+    # 1 미만 값은 유효숫자 2자리 이상 유지 (0.000742 USD 가 "0.00" 으로 읽히지 않게)
+    if abs(x) >= 1 or x == 0:
+        return f"{x:.2f}"
+    decimals = 2
+    while abs(x) < 10 ** -(decimals - 1) and decimals < 8:
+        decimals += 1
+    return f"{x:.{decimals}f}"
+
 def _format_response(base: str, target: str, amount: float | None, rate: float) -> str:
     """
     - amount가 있으면 그대로 변환 결과
@@ -182,9 +300,9 @@ def _format_response(base: str, target: str, amount: float | None, rate: float)
         # 위 fetch 구현은 Frankfurter는 rates[target], amount None이면 1단위 비율,
         # exchangerate.host는 result가 amount 적용 값. 혼선을 피하려고 아래로 통일:
         # amount가 주어진 경우엔 다시 직접 계산:
-        # unit_rate = _fetch_rate(base, target, None)  # 1단위 비율
+        unit_rate = _fetch_rate(base, target, None)  # 1단위 비율
         converted = unit_rate * amount
-        return f"{amount:.2f} {base} is {converted:.2f} {target}."
+        return f"{amount:.2f} {base} is {_fmt_value(converted)} {target}."
     else:
         fx_debug("amount is None >")
         fx_debug(f"base: {base}")
@@ -199,7 +317,7 @@ def _format_response(base: str, target: str, amount: float | None, rate: float)
                 print("target >> " + target)
                 print("base >> " + base)
             unit_rate = _fetch_rate(base, target, None)  # 1단위 비율
-            return f"One hundred yen is {(unit_rate * 100):.2f} won."
+            return f"One hundred yen is {_fmt_value(unit_rate * 100)} won."
         else:
             if target == "USD":
                 temp = target
@@ -211,11 +329,52 @@ def _format_response(base: str, target: str, amount: float | None, rate: float)
                 base = temp
 
             unit_rate = _fetch_rate(base, target, None)  # 1단위 비율
-            return f"One {TTS_CCY_NAME.get(base, base)} is {unit_rate:.2f} {TTS_CCY_NAME.get(target, target)}."
+            return f"One {TTS_CCY_NAME.get(base, base)} is {_fmt_value(unit_rate)} {TTS_CCY_NAME.get(target, target)}."
+
+def _join_spoken(items: list[str]) -> str:
+    if len(items) <= 1:
+        return "".join(items)
+    return ", ".join(items[:-1]) + " and " + items[-1]
+
+def _flip_for_speech(base: str, target: str) -> bool:
+    """_format_response 의 단일 페어 규칙과 동일: 단위가 큰 통화를 1(엔은 100) 단위로 읽는다."""
+    return target == "USD" or (base != "USD" and target == "CAD") or (base, target) == ("KRW", "JPY")
+
+def _format_multi_response(base: str, amount: float | None, rates: dict, unsupported: list[str]) -> str:
+    """
+    rates: {target: 1단위 비율} → 한 문장으로
+    "100.00 USD is 15012.00 yen, 136342.00 won and 135.87 CAD."
+    금액이 없을 때 단위가 더 큰 대상 통화는 단일 페어처럼 뒤집어 읽음:
+    "won to yen and dollar" → "One hundred yen is 925.12 won. One USD is 1380.50 won."
+    """
+    base_name = TTS_CCY_NAME.get(base, base)
+    flipped = []
+    if amount is not None:
+        qty, head = amount, f"{amount:.2f} {base}"
+    else:
+        flipped = [t for t in rates if _flip_for_speech(base, t)]
+        if base in ("JPY", "KRW"):
+            # 단위가 작은 통화는 100 단위로 읽기 좋게 (_format_response 와 동일)
+            qty, head = 100.0, f"One hundred {base_name}"
+        else:
+            qty, head = 1.0, f"One {base_name}"
+    sentences = []
+    parts = [f"{_fmt_value(rates[t] * qty)} {TTS_CCY_NAME.get(t, t)}" for t in rates if t not in flipped]
+    if parts:
+        sentences.append(f"{head} is {_join_spoken(parts)}.")
+    for t in flipped:
+        t_qty, t_head = (100.0, "One hundred yen") if t == "JPY" else (1.0, f"One {TTS_CCY_NAME.get(t, t)}")
+        sentences.append(f"{t_head} is {_fmt_value(t_qty / rates[t])} {base_name}.")
+    msg = " ".join(sentences)
+    if unsupported:
+        names = _join_spoken([TTS_CCY_NAME.get(t, t) for t in unsupported])
+        verb = "is" if len(unsupported) == 1 else "are"
+        msg += f" {names} {verb} not supported from {base_name}."
+    return msg
 
 # ------------------- 엔트리 -------------------
 def handle_fx_query(q: str):
-    s = q.strip()
+    s = words_to_digits(q.strip())
     fx_debug("input:", s)
 
     # 한 번만 말하기 가드
@@ -226,6 +385,26 @@ def handle_fx_query(q: str):
             speak_en(msg)
             spoken = True
 
+    # 0) 대상 통화가 여러 개면 한 번의 요청으로 모두 조회
+    m_amount, m_base, m_targets = infer_multi_targets(s)
+    if m_base and len(m_targets) >= 2:
+        allowed = [t for t in m_targets if (m_base, t) in ALLOWED_PAIRS]
+        unsupported = [t for t in m_targets if t not in allowed]
+        fx_debug("multi:", {"amount": m_amount, "from": m_base, "to": allowed, "unsupported": unsupported})
+        if not allowed:
+            say_once("That pair is not supported.")
+            return
+        try:
+            rates = _fetch_rates(m_base, allowed, None)  # 1단위 비율
+        except Exception as e:
+            fx_debug("multi fetch failed:", repr(e))
+            say_once("I couldn't fetch the exchange rate right now.")
+            return
+        txt = _format_multi_response(m_base, m_amount, rates, unsupported)
+        fx_debug("ok:", txt)
+        say_once(txt)
+        return
+
     # 1) 금액+from/to 우선
     m = RE_AMOUNT_FROM_TO.search(s)
     fx_debug("RE match:", m)
@@ -233,6 +412,9 @@ def handle_fx_query(q: str):
         amount = float(m.group("amount")) if m.group("amount") else None
         base = _norm_ccy(m.group("from"))
         target = _norm_ccy(m.group("to"))
+        if m_base and len(m_targets) == 1:
+            # 토큰 파서 결과 우선 ("canadian dollars to yen" → CAD, 정규식은 dollars 만 봄)
+            base, target = m_base, m_targets[0]
         fx_debug("parsed:", {"amount": amount, "from": base, "to": target})
 
         if not base or not target:
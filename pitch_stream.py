@@ -0,0 +1,165 @@
+# pitch_stream.py
+# 실시간 F0(기본 주파수) 추정기 — asr_vosk_live 의 16 kHz int16 블록을 그대로 받아 처리
+# voice test/voice_gender_recognition.py 의 librosa.yin 파일 단위 분석을
+# 프레임 단위 스트리밍 + NumPy 벡터화 YIN 으로 옮긴 버전.
+import time
+import numpy as np
+
+# ------------------- 설정 -------------------
+SAMPLE_RATE = 16000
+FMIN = 50.0            # voice_gender_recognition.py 와 동일한 탐색 범위
+FMAX = 300.0
+FRAME_LENGTH = 1024    # 64 ms 분석 창 (win + 최대 지연)
+HOP_LENGTH = 256       # 16 ms 간격 → 4096 블록당 16 프레임
+WIN_LENGTH = FRAME_LENGTH // 2
+YIN_THRESHOLD = 0.15   # CMND 임계값 (낮을수록 엄격)
+SILENCE_RMS = 200.0    # int16 스케일 RMS. 이보다 조용하면 무성(unvoiced) 처리
+GENDER_F0_SPLIT = 165.0  # voice_gender_recognition.py 의 male/female 경계
+
+
+def _yin_frames(frames: np.ndarray, sr: int, fmin: float, fmax: float, threshold: float) -> np.ndarray:
+    """
+    frames: (N, FRAME_LENGTH) float64
+    반환: (N,) F0 [Hz], 무성 프레임은 0
+    """
+    n, L = frames.shape
+    W = L // 2
+    tau_min = max(2, int(sr // fmax))
+    tau_max = min(W - 1, int(np.ceil(sr / fmin)))
+
+    # 1) 자기상관 r(tau) = sum_{j<W} x[j] * x[j+tau]  (FFT 한 번에 전 프레임 처리)
+    nfft = 2 * L
+    X = np.fft.rfft(frames, n=nfft, axis=1)
+    Y = np.fft.rfft(frames[:, :W], n=nfft, axis=1)
+    acf = np.fft.irfft(X * np.conj(Y), n=nfft, axis=1)[:, :tau_max + 1]
+
+    # 2) 에너지 항: e0 = sum_{j<W} x[j]^2, e_tau = sum_{j=tau}^{tau+W-1} x[j]^2
+    cs = np.concatenate([np.zeros((n, 1)), np.cumsum(frames * frames, axis=1)], axis=1)
+    taus = np.arange(tau_max + 1)
+    e_tau = cs[:, taus + W] - cs[:, taus]
+    e0 = e_tau[:, :1]
+
+    # 3) 차분 함수 + 누적 평균 정규화 (CMND)
+    d = np.maximum(e0 + e_tau - 2.0 * acf, 0.0)
+    d[:, 0] = 0.0
+    cum = np.cumsum(d[:, 1:], axis=1)
+    cmnd = np.ones_like(d)
+    cmnd[:, 1:] = d[:, 1:] * taus[1:] / np.maximum(cum, 1e-12)
+
+    # 4) 임계값 아래 첫 번째 골(trough) 선택 — 탐색 구간 [tau_min, tau_max-1]
+    mid = cmnd[:, tau_min:tau_max]
+    left = cmnd[:, tau_min - 1:tau_max - 1]
+    right = cmnd[:, tau_min + 1:tau_max + 1]
+    trough = (mid < threshold) & (mid <= left) & (mid <= right)
+    voiced = trough.any(axis=1)
+    first = np.argmax(trough, axis=1) + tau_min
+
+    # 5) 포물선 보간으로 서브샘플 지연 보정
+    rows = np.arange(n)
+    c = np.clip(first, 1, tau_max - 1)
+    y0, y1, y2 = cmnd[rows, c - 1], cmnd[rows, c], cmnd[rows, c + 1]
+    denom = y0 - 2.0 * y1 + y2
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (y0 - y2) / np.where(denom == 0, 1.0, denom), 0.0)
+    tau = c + np.clip(shift, -1.0, 1.0)
+
+    return np.where(voiced, sr / tau, 0.0)
+
+
+class StreamingPitchEstimator:
+    """
+    블록 단위로 feed() 하면 발화(utterance) 동안의 F0 통계를 누적한다.
+    - feed(bytes | ndarray): int16 모노 PCM
+    - profile(): {"mean_f0", "f0_std", "voiced_ratio", "frames", "gender"}
+    - reset(): 다음 발화 시작 시 호출
+    블록 경계를 넘는 프레임은 내부 tail 버퍼로 이어 붙이므로 블록 크기와 무관하게 동일한 결과.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE, fmin: float = FMIN, fmax: float = FMAX,
+                 frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH,
+                 threshold: float = YIN_THRESHOLD, silence_rms: float = SILENCE_RMS):
+        self.sr = sr
+        self.fmin = fmin
+        self.fmax = fmax
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.threshold = threshold
+        self.silence_rms = silence_rms
+        self._tail = np.zeros(0, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        # tail 은 버리지 않아도 되지만, TTS 에코 등 이전 발화 잔여물이 섞이지 않도록 같이 비운다
+        self._tail = np.zeros(0, dtype=np.float64)
+        self._frames = 0
+        self._voiced = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def feed(self, block) -> np.ndarray:
+        """블록을 처리하고 이번 블록에서 새로 얻은 프레임별 F0 배열을 반환 (무성=0)."""
+        if isinstance(block, (bytes, bytearray, memoryview)):
+            x = np.frombuffer(block, dtype=np.int16)
+        else:
+            x = np.asarray(block).reshape(-1)
+        buf = np.concatenate([self._tail, x.astype(np.float64)])
+
+        L, H = self.frame_length, self.hop_length
+        if len(buf) < L:
+            self._tail = buf
+            return np.zeros(0)
+
+        n = 1 + (len(buf) - L) // H
+        frames = np.lib.stride_tricks.sliding_window_view(buf, L)[::H][:n]
+        self._tail = buf[n * H:]
+
+        f0 = _yin_frames(frames, self.sr, self.fmin, self.fmax, self.threshold)
+
+        # 무음 게이트: 조용한 프레임은 무성으로 취급
+        rms = np.sqrt(np.mean(frames[:, :L // 2] ** 2, axis=1))
+        f0 = np.where(rms >= self.silence_rms, f0, 0.0)
+
+        voiced = f0[f0 > 0]
+        self._frames += n
+        self._voiced += len(voiced)
+        self._sum += float(voiced.sum())
+        self._sumsq += float((voiced * voiced).sum())
+        return f0
+
+    def profile(self) -> dict | None:
+        if self._frames == 0:
+            return None
+        ratio = self._voiced / self._frames
+        if self._voiced == 0:
+            return {"mean_f0": None, "f0_std": None, "voiced_ratio": 0.0,
+                    "frames": self._frames, "gender": None}
+        mean = self._sum / self._voiced
+        var = max(self._sumsq / self._voiced - mean * mean, 0.0)
+        return {
+            "mean_f0": round(mean, 1),
+            "f0_std": round(var ** 0.5, 1),
+            "voiced_ratio": round(ratio, 3),
+            "frames": self._frames,
+            "gender": "male" if mean < GENDER_F0_SPLIT else "female",
+        }
+
+
+if __name__ == "__main__":
+    # 블록당 처리 시간 측정 (합성 음성 유사 신호: 120 Hz 하모닉 + 잡음)
+    block = 4096
+    t = np.arange(block * 50) / SAMPLE_RATE
+    sig = sum(np.sin(2 * np.pi * 120 * k * t) / k for k in range(1, 6))
+    sig = sig + 0.05 * np.random.default_rng(0).standard_normal(len(t))
+    pcm = (sig / np.max(np.abs(sig)) * 8000).astype(np.int16)
+
+    est = StreamingPitchEstimator()
+    costs = []
+    for i in range(0, len(pcm), block):
+        chunk = pcm[i:i + block].tobytes()
+        t0 = time.perf_counter()
+        est.feed(chunk)
+        costs.append(time.perf_counter() - t0)
+    costs = np.array(costs[1:]) * 1000
+    block_ms = block / SAMPLE_RATE * 1000
+    print(f"[Pitch] profile: {est.profile()}")
+    print(f"[Pitch] per-block: mean {costs.mean():.2f} ms, max {costs.max():.2f} ms "
+          f"(block = {block_ms:.0f} ms, load {costs.mean() / block_ms * 100:.1f}%)")
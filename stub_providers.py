@@ -0,0 +1,256 @@
+# stub_providers.py
+# Frankfurter / exchangerate.host / weatherapi.com 로컬 스탠드인 서버.
+# 기록해 둔 응답을 재생하고, 지연(latency)·오류율·타임아웃(응답 지연으로 클라이언트 timeout 유발)을 설정할 수 있다.
+#
+#   python stub_providers.py --latency-ms 200 --error-rate 0.1
+#   → 출력되는 export 줄을 적용하면 fxapi_en / weatherapi_en 이 스텁으로 요청한다
+#     (FX_FRANKFURTER_URLS, FX_EXHOST_URL, WEATHERAPI_BASE_URL)
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ------------------- 기록된 응답 -------------------
+# Frankfurter /latest 응답에서 뽑은 EUR 기준 환율 스냅샷 — 모든 교차 환율은 여기서 계산
+RECORDED_EUR_RATES = {
+    "EUR": 1.0,
+    "USD": 1.0842,
+    "JPY": 162.37,
+    "KRW": 1478.21,
+    "CAD": 1.4731,
+}
+RECORDED_DATE = "2025-03-14"
+
+# weatherapi.com current.json / forecast.json 에서 쓰는 필드만 남긴 기록
+RECORDED_WEATHER = {
+    "Toronto": {"temp_c": 3.0, "condition": "Partly cloudy", "wind_kph": 18.0, "precip_mm": 0.0,
+                "avg": 2.1, "max": 6.0, "min": -1.2, "rain": 20, "max_wind": 24.5},
+    "Tokyo": {"temp_c": 14.0, "condition": "Sunny", "wind_kph": 9.0, "precip_mm": 0.0,
+              "avg": 12.4, "max": 17.1, "min": 8.3, "rain": 0, "max_wind": 14.0},
+    "Seoul": {"temp_c": 8.0, "condition": "Clear", "wind_kph": 11.2, "precip_mm": 0.0,
+              "avg": 6.5, "max": 12.0, "min": 1.4, "rain": 10, "max_wind": 16.9},
+    "Busan": {"temp_c": 11.0, "condition": "Light rain", "wind_kph": 20.5, "precip_mm": 1.2,
+              "avg": 10.3, "max": 13.2, "min": 7.9, "rain": 78, "max_wind": 27.4},
+    "Miyazaki": {"temp_c": 16.0, "condition": "Overcast", "wind_kph": 7.6, "precip_mm": 0.1,
+                 "avg": 15.2, "max": 19.0, "min": 11.6, "rain": 40, "max_wind": 12.2},
+    "New York": {"temp_c": 6.0, "condition": "Mist", "wind_kph": 13.0, "precip_mm": 0.3,
+                 "avg": 5.5, "max": 9.4, "min": 2.0, "rain": 55, "max_wind": 21.6},
+}
+
+
+# ------------------- 장애 시나리오 -------------------
+@dataclass
+class StubBehavior:
+    latency_ms: float = 0.0      # 평균 응답 지연
+    jitter_ms: float = 0.0       # ± 균등 분포
+    error_rate: float = 0.0      # 이 확률로 HTTP 503
+    timeout_rate: float = 0.0    # 이 확률로 hang_sec 동안 응답하지 않음
+    hang_sec: float = 30.0
+
+
+def _rate(base: str, target: str) -> float:
+    return RECORDED_EUR_RATES[target] / RECORDED_EUR_RATES[base]
+
+
+def frankfurter_latest(qs: dict):
+    base = qs.get("from", ["EUR"])[0].upper()
+    targets = qs.get("to", [""])[0].upper()
+    amount = float(qs.get("amount", ["1"])[0])
+    if base not in RECORDED_EUR_RATES:
+        return 404, {"message": "not found"}
+    targets = [t for t in targets.split(",") if t] or [c for c in RECORDED_EUR_RATES if c != base]
+    if any(t not in RECORDED_EUR_RATES for t in targets):
+        return 404, {"message": "not found"}
+    rates = {t: round(_rate(base, t) * amount, 5) for t in targets if t != base}
+    return 200, {"amount": amount, "base": base, "date": RECORDED_DATE, "rates": rates}
+
+
+def exhost_convert(qs: dict):
+    base = qs.get("from", [""])[0].upper()
+    target = qs.get("to", [""])[0].upper()
+    amount = float(qs.get("amount", ["1"])[0])
+    if base not in RECORDED_EUR_RATES or target not in RECORDED_EUR_RATES:
+        return 200, {"success": False, "error": {"code": 402, "type": "invalid_currency"}}
+    r = _rate(base, target)
+    return 200, {"success": True, "query": {"from": base, "to": target, "amount": amount},
+                 "info": {"rate": r}, "date": RECORDED_DATE, "result": round(r * amount, 5)}
+
+
+def exhost_latest(qs: dict):
+    base = qs.get("base", ["EUR"])[0].upper()
+    symbols = [t for t in qs.get("symbols", [""])[0].upper().split(",") if t]
+    amount = float(qs.get("amount", ["1"])[0])
+    symbols = symbols or [c for c in RECORDED_EUR_RATES if c != base]
+    if base not in RECORDED_EUR_RATES or any(t not in RECORDED_EUR_RATES for t in symbols):
+        return 200, {"success": False, "error": {"code": 402, "type": "invalid_currency"}}
+    return 200, {"success": True, "base": base, "date": RECORDED_DATE,
+                 "rates": {t: round(_rate(base, t) * amount, 5) for t in symbols}}
+
+
+def _weather_city(qs: dict):
+    q = qs.get("q", [""])[0].strip().lower()
+    return next((c for c in RECORDED_WEATHER if c.lower() == q), None)
+
+
+def weather_current(qs: dict):
+    city = _weather_city(qs)
+    if not city:
+        return 400, {"error": {"code": 1006, "message": "No matching location found."}}
+    w = RECORDED_WEATHER[city]
+    return 200, {
+        "location": {"name": city},
+        "current": {"temp_c": w["temp_c"], "condition": {"text": w["condition"]},
+                    "wind_kph": w["wind_kph"], "precip_mm": w["precip_mm"]},
+    }
+
+
+def weather_forecast(qs: dict):
+    status, data = weather_current(qs)
+    if status != 200:
+        return status, data
+    w = RECORDED_WEATHER[data["location"]["name"]]
+    days = int(qs.get("days", ["3"])[0])
+    today = date.today()
+    data["forecast"] = {"forecastday": [{
+        "date": (today + timedelta(days=i)).isoformat(),
+        "day": {"avgtemp_c": w["avg"], "maxtemp_c": w["max"], "mintemp_c": w["min"],
+                "daily_chance_of_rain": w["rain"], "maxwind_kph": w["max_wind"],
+                "condition": {"text": w["condition"]}},
+    } for i in range(days)]}
+    return 200, data
+
+
+# 경로 끝부분으로 매칭 — /dev/latest, /app/latest 처럼 미러 접두어가 붙어도 동작
+ROUTES = {
+    "frankfurter": {"/latest": frankfurter_latest},
+    "exhost": {"/convert": exhost_convert, "/latest": exhost_latest},
+    "weatherapi": {"/current.json": weather_current, "/forecast.json": weather_forecast},
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    provider = None
+    behavior = StubBehavior()
+    rng = random.Random()
+    stats = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 이미 timeout 으로 끊음
+
+    def do_GET(self):
+        b = self.behavior
+        self.stats["requests"] += 1
+        delay = max(0.0, b.latency_ms + self.rng.uniform(-b.jitter_ms, b.jitter_ms)) / 1000.0
+        roll = self.rng.random()
+        if roll < b.timeout_rate:
+            self.stats["timeouts"] += 1
+            time.sleep(b.hang_sec)
+            self._send(504, {"error": "stub timeout"})
+            return
+        time.sleep(delay)
+        if roll < b.timeout_rate + b.error_rate:
+            self.stats["errors"] += 1
+            self._send(503, {"error": "stub unavailable"})
+            return
+
+        u = urlparse(self.path)
+        handler = next((h for suffix, h in ROUTES[self.provider].items() if u.path.endswith(suffix)), None)
+        if handler is None:
+            self._send(404, {"error": "unknown endpoint"})
+            return
+        status, data = handler(parse_qs(u.query))
+        self._send(status, data)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # 기본 listen backlog(5)는 벤치마크 동시 접속에서 넘쳐 SYN 재전송(~1s) 지연이 측정에 섞임
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubServer:
+    """한 공급자(provider)의 스텁 서버. behavior 는 실행 중에도 교체 가능."""
+
+    def __init__(self, provider: str, behavior: StubBehavior | None = None, host="127.0.0.1", port=0, seed=None):
+        handler = type(f"{provider}_Handler", (_Handler,), {
+            "provider": provider,
+            "behavior": behavior or StubBehavior(),
+            "rng": random.Random(seed),
+            "stats": {"requests": 0, "errors": 0, "timeouts": 0},
+        })
+        self._handler = handler
+        self.httpd = _StubHTTPServer((host, port), handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> dict:
+        return self._handler.stats
+
+    def set_behavior(self, behavior: StubBehavior):
+        self._handler.behavior = behavior
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def start_stubs(behaviors: dict[str, StubBehavior] | None = None, seed=None) -> dict[str, StubServer]:
+    behaviors = behaviors or {}
+    return {p: StubServer(p, behaviors.get(p), seed=seed).start() for p in ROUTES}
+
+
+def provider_urls(stubs: dict[str, StubServer]) -> dict[str, str]:
+    """fxapi_en / weatherapi_en 설정값으로 쓸 베이스 URL (환경변수 이름 → 값)."""
+    f = stubs["frankfurter"].url
+    return {
+        "FX_FRANKFURTER_URLS": f"{f}/dev,{f}/app",
+        "FX_EXHOST_URL": stubs["exhost"].url,
+        "WEATHERAPI_BASE_URL": f"{stubs['weatherapi'].url}/v1",
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local stand-in servers for the FX / weather providers")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-rate", type=float, default=0.0)
+    ap.add_argument("--hang-sec", type=float, default=30.0)
+    args = ap.parse_args()
+
+    behavior = StubBehavior(args.latency_ms, args.jitter_ms, args.error_rate, args.timeout_rate, args.hang_sec)
+    stubs = start_stubs({p: behavior for p in ROUTES})
+    for k, v in provider_urls(stubs).items():
+        print(f"export {k}={v}")
+    print("[Stub] Serving... (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for s in stubs.values():
+            s.stop()
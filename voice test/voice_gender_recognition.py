@@ -1,32 +1,221 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import librosa
 import numpy as np
 from gtts import gTTS
-import os
 
-# 🎤 사용자에게 파일 경로 입력받기
-file_path = input("🔍 분석할 오디오 파일 경로를 입력하세요 (예: test.wav, sample.mp3): ").strip()
-
-# 📁 파일 존재 여부 확인
-if not os.path.exists(file_path):
-    print("❌ 해당 파일이 존재하지 않습니다.")
-    exit()
-
-# 🎶 입력 음성 재생 (mpg123로 대체도 가능)
-print("🔊 입력한 오디오를 재생합니다...")
-os.system(f"mpg123 \"{file_path}\"")
-
-# 📥 오디오 로딩 후 성별 분석
-y, sr = librosa.load(file_path, sr=None)
-f0 = librosa.yin(y, fmin=50, fmax=300, sr=sr)
-f0_nonzero = f0[f0 > 0]
-mean_f0 = np.mean(f0_nonzero)
-gender = "male" if mean_f0 < 165 else "female"
-
-print(f"\n📈 평균 기본 주파수: {mean_f0:.2f} Hz")
-print(f"🧑‍⚖️ 추정 성별: {gender.title()}")
-
-# 🔊 TTS 안내 생성 및 재생
-tts_text = f"This is a {gender} voice."
-tts = gTTS(tts_text, lang='en')
-tts.save("gender_result.mp3")
-os.system("mpg123 gender_result.mp3")
\ No newline at end of file
+# ===== 분석 설정 =====
+ANALYSIS_SR = 16000        # 원본 샘플레이트 대신 16 kHz 로 디코딩 (F0 50~300 Hz 에는 충분, 디코딩/YIN 비용 감소)
+FMIN, FMAX = 50, 300
+GENDER_F0_SPLIT = 165      # 평균 F0 < 165 Hz → male
+AUDIO_EXTS = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
+CACHE_FILE = ".gender_cache.jsonl"
+# 분석 파라미터가 바뀌면 이전 캐시 결과는 재사용하지 않음
+CACHE_PARAMS = f"sr={ANALYSIS_SR},fmin={FMIN},fmax={FMAX},split={GENDER_F0_SPLIT}"
+
+
+# 📥 오디오 로딩 후 성별 분석 (워커 프로세스에서 실행)
+def analyze_file(file_path: str, sr: int | None = ANALYSIS_SR) -> dict:
+    y, sr = librosa.load(file_path, sr=sr, mono=True)
+    f0 = librosa.yin(y, fmin=FMIN, fmax=FMAX, sr=sr)
+    f0_nonzero = f0[f0 > 0]
+    if len(f0_nonzero) == 0:
+        return {"mean_f0": None, "gender": None, "duration": round(len(y) / sr, 3)}
+    mean_f0 = float(np.mean(f0_nonzero))
+    gender = "male" if mean_f0 < GENDER_F0_SPLIT else "female"
+    return {"mean_f0": round(mean_f0, 2), "gender": gender, "duration": round(len(y) / sr, 3)}
+
+
+def _analyze_job(args):
+    path, digest = args
+    try:
+        res = analyze_file(path)
+        res["error"] = None
+    except Exception as e:
+        res = {"mean_f0": None, "gender": None, "duration": None, "error": repr(e)}
+    res["path"] = path
+    res["sha1"] = digest
+    res["params"] = CACHE_PARAMS
+    return res
+
+
+def file_sha1(path: str, chunk=1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            b = f.read(chunk)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+
+# ===== 입력 수집: 디렉터리(재귀) / 매니페스트(한 줄에 한 경로, CSV면 첫 열) / 개별 파일 =====
+def collect_inputs(inputs, manifests):
+    paths = []
+    for p in inputs:
+        if os.path.isdir(p):
+            for root, _, files in os.walk(p):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in AUDIO_EXTS:
+                        paths.append(os.path.join(root, name))
+        elif os.path.isfile(p):
+            paths.append(p)
+        else:
+            print(f"⚠️ 건너뜀 (존재하지 않음): {p}", file=sys.stderr)
+    for m in manifests:
+        base = os.path.dirname(os.path.abspath(m))
+        with open(m, newline="") as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].startswith("#"):
+                    continue
+                p = row[0].strip()
+                if p == "path":  # 헤더
+                    continue
+                p = p if os.path.isabs(p) else os.path.join(base, p)
+                if os.path.isfile(p):
+                    paths.append(p)
+                else:
+                    print(f"⚠️ 건너뜀 (존재하지 않음): {p}", file=sys.stderr)
+    # 중복 제거 (순서 유지)
+    return list(dict.fromkeys(paths))
+
+
+def load_cache(path: str) -> dict:
+    cache = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    if rec.get("params") != CACHE_PARAMS:
+                        continue
+                    cache[rec["sha1"]] = rec
+                except Exception:
+                    continue
+    return cache
+
+
+def write_summary(rows, out_path: str):
+    fields = ["path", "sha1", "mean_f0", "gender", "duration", "error", "cached"]
+    if out_path.endswith(".jsonl"):
+        with open(out_path, "w") as f:
+            for r in rows:
+                f.write(json.dumps({k: r.get(k) for k in fields}, ensure_ascii=False) + "\n")
+    else:
+        with open(out_path, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            for r in rows:
+                w.writerow({k: r.get(k) for k in fields})
+
+
+def run_batch(args):
+    paths = collect_inputs(args.inputs, args.manifest)
+    if not paths:
+        print("❌ 분석할 오디오 파일이 없습니다.")
+        return 1
+
+    cache = {} if args.no_cache else load_cache(args.cache)
+    results = {}
+    digests = {}
+    for p in paths:
+        try:
+            digests[p] = file_sha1(p)
+        except OSError as e:  # 수집 후 삭제됐거나 읽기 권한 없음 → 오류 행으로 기록
+            results[p] = {"path": p, "sha1": None, "mean_f0": None, "gender": None,
+                          "duration": None, "error": repr(e), "cached": False}
+    todo = []
+    for p, digest in digests.items():
+        hit = cache.get(digest)
+        if hit and not hit.get("error"):
+            results[p] = dict(hit, path=p, cached=True)
+        else:
+            todo.append((p, digest))
+    print(f"📂 {len(paths)} files, cached {len(digests) - len(todo)}, analyzing {len(todo)} "
+          f"with {args.jobs} workers")
+
+    cache_f = None if args.no_cache else open(args.cache, "a")
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+            futs = [ex.submit(_analyze_job, job) for job in todo]
+            for i, fut in enumerate(as_completed(futs), 1):
+                res = fut.result()
+                res["cached"] = False
+                results[res["path"]] = res
+                if cache_f and not res["error"]:
+                    cache_f.write(json.dumps({k: v for k, v in res.items() if k != "cached"}) + "\n")
+                    cache_f.flush()
+                if args.play:
+                    subprocess.run(["mpg123", "-q", res["path"]])
+                if i % 50 == 0 or i == len(todo):
+                    print(f"⏳ {i}/{len(todo)}")
+    finally:
+        if cache_f:
+            cache_f.close()
+
+    rows = [results[p] for p in paths]
+    write_summary(rows, args.out)
+    counts = {}
+    for r in rows:
+        key = r.get("gender") or ("error" if r.get("error") else "unvoiced")
+        counts[key] = counts.get(key, 0) + 1
+    print(f"✅ 결과 저장: {args.out}  {counts}")
+    return 0
+
+
+def run_interactive():
+    # 🎤 사용자에게 파일 경로 입력받기
+    file_path = input("🔍 분석할 오디오 파일 경로를 입력하세요 (예: test.wav, sample.mp3): ").strip()
+
+    # 📁 파일 존재 여부 확인
+    if not os.path.exists(file_path):
+        print("❌ 해당 파일이 존재하지 않습니다.")
+        exit()
+
+    # 🎶 입력 음성 재생 (mpg123로 대체도 가능)
+    print("🔊 입력한 오디오를 재생합니다...")
+    os.system(f"mpg123 \"{file_path}\"")
+
+    res = analyze_file(file_path, sr=None)
+    if res["mean_f0"] is None:
+        print("❌ 유성음 구간을 찾지 못했습니다.")
+        return
+    gender = res["gender"]
+
+    print(f"\n📈 평균 기본 주파수: {res['mean_f0']:.2f} Hz")
+    print(f"🧑‍⚖️ 추정 성별: {gender.title()}")
+
+    # 🔊 TTS 안내 생성 및 재생
+    tts_text = f"This is a {gender} voice."
+    tts = gTTS(tts_text, lang='en')
+    tts.save("gender_result.mp3")
+    os.system("mpg123 gender_result.mp3")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Voice gender estimation (mean F0). 인자 없이 실행하면 대화형 모드.")
+    ap.add_argument("inputs", nargs="*", help="audio files or directories (recursive)")
+    ap.add_argument("-m", "--manifest", action="append", default=[], help="text/CSV manifest, one path per line")
+    ap.add_argument("-o", "--out", default="gender_results.csv", help="summary file (.csv or .jsonl)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--cache", default=CACHE_FILE, help="content-hash result cache (jsonl)")
+    ap.add_argument("--no-cache", action="store_true", help="ignore and do not update the cache")
+    ap.add_argument("--play", action="store_true", help="play each file with mpg123 after analysis")
+    args = ap.parse_args(argv)
+
+    if not args.inputs and not args.manifest:
+        run_interactive()
+        return 0
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
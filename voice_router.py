@@ -1,8 +1,12 @@
 # === voice_router.py ===
 import re
 import time
-from weatherapi_en import handle_weather_query, speak_en
-from fxapi_en import handle_fx_query
+from weatherapi_en import (CITY_ALIASES, detect_intent, handle_weather_query, parse_cities, parse_when,
+                           speak_en)
+from fxapi_en import (CONNECTORS, FILLERS, _norm_ccy, handle_fx_query, infer_multi_targets,
+                      infer_pair_freeform, words_to_digits)
+from confidence_gate import (GATE_STATS, gate, confirm_prompt, expected_fetches,
+                             is_yes, is_no, stats_line)
 
 # ------------------------
 # State variables
@@ -27,6 +31,8 @@ _TTS_SUPPRESS_UNTIL = 0.0
 POST_TTS_SUPPRESS_SEC = 1.25   # Ignore ASR for this long after TTS finishes
 
 recognizer_reset_cb = None  # Hook to connect external rec.Reset()
+grammar_switch_cb = None    # Hook to swap the active Vosk grammar (asr_grammars context)
+last_speaker = None         # Speaker profile of the most recent utterance (pitch_stream)
 
 def _now() -> float:
     return time.time()
@@ -51,6 +57,125 @@ def set_recognizer_reset(cb):
     global recognizer_reset_cb
     recognizer_reset_cb = cb
 
+def set_grammar_switch(cb):
+    global grammar_switch_cb
+    grammar_switch_cb = cb
+
+# ------------------------
+# Follow-up dialogue context
+# ------------------------
+# After an fx/weather answer the ASR switches to a smaller grammar for a while,
+# and bare follow-ups ("tokyo tomorrow", "won") are completed with the slots of
+# the previous turn and routed to the same domain.
+FOLLOWUP_SEC = 8.0
+_followup_domain = None
+_followup_until = 0.0
+_followup_slots = None  # fx: {"base", "targets"} / weather: {"cities", "when", "lead"}
+
+def _enter_followup(domain: str, slots: dict | None = None):
+    global _followup_domain, _followup_until, _followup_slots
+    _followup_domain = domain
+    _followup_until = _now() + FOLLOWUP_SEC
+    _followup_slots = slots
+    if grammar_switch_cb:
+        try:
+            grammar_switch_cb(domain, FOLLOWUP_SEC)
+        except Exception:
+            pass
+
+def _leave_followup():
+    global _followup_domain, _followup_until, _followup_slots
+    if _followup_domain is None:
+        return
+    _followup_domain, _followup_until, _followup_slots = None, 0.0, None
+    if grammar_switch_cb:
+        try:
+            grammar_switch_cb("default")
+        except Exception:
+            pass
+
+# Low-confidence slot → "Did you say ...?" → (domain, query, expires_at, fetches)
+CONFIRM_WINDOW_SEC = 8.0
+_pending_confirm = None
+
+def _active_followup():
+    if _followup_domain and _now() < _followup_until:
+        return _followup_domain
+    return None
+
+def has_followup_slot(domain: str, q: str) -> bool:
+    """A bare follow-up only counts if it carries a slot for the context ("tokyo", "yen", "yes"),
+    so stray words like "in" / "the" / "to" are still dropped as short noise."""
+    q = q.lower()
+    if domain == "weather":
+        return bool(WHEN_PAT.search(q)) or any(re.search(rf"\b{re.escape(k)}\b", q) for k in CITY_ALIASES)
+    if domain == "fx":
+        return any(_norm_ccy(t) for t in re.findall(r"[a-z]+", words_to_digits(q)))
+    if domain == "confirm":
+        return is_yes(q) or is_no(q)
+    return False
+
+_INTENT_LEAD = {"temperature": "temperature", "precip": "rain", "wind": "wind", "forecast": "forecast"}
+
+def _ccy_codes(s: str) -> list:
+    codes = []
+    for t in re.findall(r"[a-z]+", s):
+        c = None if t in FILLERS else _norm_ccy(t)
+        if c and c not in codes:
+            codes.append(c)
+    return codes
+
+def _resolve_slots(domain: str, q: str) -> dict | None:
+    """Slots of a query that is about to be answered, kept for the follow-up window."""
+    q = q.lower()
+    if domain == "fx":
+        s = words_to_digits(q)
+        _, base, targets = infer_multi_targets(s)
+        if not (base and targets):
+            base, target = infer_pair_freeform(s)
+            targets = [target] if target else []
+        return {"base": base, "targets": targets} if base and targets else None
+    if domain == "weather":
+        _, label = parse_when(q)
+        return {"cities": parse_cities(q), "when": label,
+                "lead": _INTENT_LEAD.get(detect_intent(q), "weather")}
+    return None
+
+def _merge_followup(domain: str, q: str, slots: dict | None) -> str | None:
+    """
+    Complete a bare follow-up with the previous turn's slots, or None if it cannot be resolved.
+      fx      ("usd to yen"):       "won" → "usd to krw", "from won" / "fifty won" → "krw to jpy"
+      weather ("weather in tokyo"): "tomorrow" → "weather tomorrow in tokyo", "seoul" → "weather today in seoul"
+    """
+    if not slots:
+        return None
+    if domain == "fx":
+        s = words_to_digits(q)
+        codes = _ccy_codes(s)
+        if not codes:
+            return None
+        base, targets = slots["base"], slots["targets"]
+        c = codes[0]
+        toks = s.split()
+        amount = next((t for t in toks if re.fullmatch(r"\d+(?:\.\d+)?", t)), None)
+        pos = next(i for i, t in enumerate(toks) if _norm_ccy(t) == c)
+        if amount or "from" in toks[:pos] or any(t in CONNECTORS for t in toks[pos + 1:]):
+            # the currency is the new base: "from won", "fifty won", "won to"
+            base, targets = c, [t for t in targets if t != c] or [base]
+        elif c == base:
+            base, targets = targets[0], [c]
+        else:
+            targets = [c]
+        head = f"{amount} " if amount else ""
+        return f"{head}{base.lower()} to {' and '.join(t.lower() for t in targets)}"
+    if domain == "weather":
+        cities = [v for k, v in CITY_ALIASES.items() if re.search(rf"\b{re.escape(k)}\b", q)]
+        cities = list(dict.fromkeys(cities)) or slots["cities"]
+        when = parse_when(q)[1] if WHEN_PAT.search(q) else slots["when"]
+        lead = _INTENT_LEAD.get(detect_intent(q)) if detect_intent(q) != "current" else None
+        return f"{lead or slots['lead']} {when} in {' and '.join(c.lower() for c in cities)}"
+    return None
+
 # ------------------------
 # Domain detection / slicing
 # ------------------------
@@ -113,8 +238,38 @@ WHEN_PAT = re.compile(r"\b(today|tomorrow|monday|tuesday|wednesday|thursday|frid
 # ------------------------
 # on_asr_final main routine
 # ------------------------
-def on_asr_final(recognized_text: str, confidence: float | None = None):
-    global _last_text, _last_ts
+def _dispatch(domain: str, q: str):
+    if domain == "fx":
+        keep_awake(KEEP_AWAKE_ON_ACTIVITY_SEC)
+        try:
+            handle_fx_query(q)
+        finally:
+            # ★ After TTS: suppress/ hard reset / grace period
+            suppress_asr_for(POST_TTS_SUPPRESS_SEC)
+            _hard_reset_after_tts()
+            keep_awake(POST_TTS_GRACE_SEC)
+            _enter_followup("fx", _resolve_slots("fx", q))
+
+    elif domain == "weather":
+        keep_awake(KEEP_AWAKE_ON_ACTIVITY_SEC)
+        try:
+            handle_weather_query(q)
+        finally:
+            suppress_asr_for(POST_TTS_SUPPRESS_SEC)
+            _hard_reset_after_tts()
+            keep_awake(POST_TTS_GRACE_SEC)
+            _enter_followup("weather", _resolve_slots("weather", q))
+
+    else:
+        print(f"[Router] Unknown domain: {q}")
+
+def on_asr_final(recognized_text: str, confidence: float | None = None, speaker: dict | None = None,
+                 words: list | None = None):
+    """
+    confidence: utterance-level score (mean word conf) — informational
+    words: Vosk result["result"] items ({"word", "conf", ...}) used by the confidence gate
+    """
+    global _last_text, _last_ts, last_speaker, _pending_confirm
 
     # 0) Gate for suppressing TTS echo
     if _now() < _TTS_SUPPRESS_UNTIL:
@@ -125,14 +280,23 @@ def on_asr_final(recognized_text: str, confidence: float | None = None):
     q_raw = recognized_text
     q = normalize(q_raw)
 
+    # Speaker profile (mean F0 / voiced ratio) from pitch_stream
+    last_speaker = speaker
+    if speaker:
+        print(f"[Router] Speaker: mean_f0={speaker.get('mean_f0')} Hz, "
+              f"voiced={speaker.get('voiced_ratio')}, gender={speaker.get('gender')}")
+
     # Extend awake state due to detected activity
     keep_awake(KEEP_AWAKE_ON_ACTIVITY_SEC)
 
     # Check wake phrase
     is_wake_like = _is_wake_phrase(q)
 
-    # 2) Filter very short utterances
-    if not (is_wake_like or WEATHER_INTENT.search(q) or FX_INTENT.search(q) or looks_like_fx(q)):
+    followup = _active_followup()
+
+    # 2) Filter very short utterances (single-word follow-up answers with a slot are allowed)
+    slot_followup = bool(followup) and has_followup_slot(followup, q)
+    if not (is_wake_like or slot_followup or WEATHER_INTENT.search(q) or FX_INTENT.search(q) or looks_like_fx(q)):
         if len(q) < 3 or len(q.split()) < 2:
             print(f"[Router] Ignored short: {q}")
             return
@@ -144,6 +308,24 @@ def on_asr_final(recognized_text: str, confidence: float | None = None):
         return
     _last_text, _last_ts = q, now
 
+    # 3b) Answer to a pending "Did you say ...?"
+    if _pending_confirm:
+        p_domain, p_q, p_until, p_fetches = _pending_confirm
+        _pending_confirm = None
+        # "no" wins over "yes": "no ... right" cancels
+        if _now() < p_until and is_no(q):
+            GATE_STATS["fetches_saved"] += p_fetches
+            GATE_STATS["tts_saved"] += 1
+            print(f"[Router] Cancelled: {p_q} | {stats_line()}")
+            _leave_followup()
+            return
+        if _now() < p_until and is_yes(q):
+            GATE_STATS["confirmed"] += 1
+            print(f"[Router] Confirmed: {p_q}")
+            _dispatch(p_domain, p_q)
+            return
+        # Anything else is handled as a new utterance
+
     # 4) Sleep commands
     if any(q.startswith(s) or q == s for s in SLEEP_WORDS):
         _sleep()
@@ -162,6 +344,8 @@ def on_asr_final(recognized_text: str, confidence: float | None = None):
             q = rest
         else:
             print("[Router] Wake!")
+            # A bare wake word starts a fresh turn: back to the full grammar
+            _leave_followup()
             return
 
     # 6) If still sleeping, ignore
@@ -175,31 +359,46 @@ def on_asr_final(recognized_text: str, confidence: float | None = None):
 
     # 8) Domain routing
     domain = route_domain(q)
+    bare = False
+    if domain == "unknown" and followup in ("fx", "weather") and slot_followup:
+        domain, bare = followup, True
+    elif domain == "fx" and followup == "fx" and len(_ccy_codes(words_to_digits(q))) < 2:
+        bare = True  # "won", "from yen" — the handler needs two currencies
+    if bare:
+        merged = _merge_followup(domain, q, _followup_slots)
+        if not merged:
+            print(f"[Router] Follow-up without context, ignored: {q}")
+            return
+        print(f"[Router] Follow-up: {q} -> {merged}")
+        q = merged
 
     # 9) For weather, parse city/time
     if domain == "weather":
         _ = extract_city(q)
         _ = WHEN_PAT.search(q) is not None
 
-    # 10) Invoke handlers
-    if domain == "fx":
-        keep_awake(KEEP_AWAKE_ON_ACTIVITY_SEC)
-        try:
-            handle_fx_query(q)
-        finally:
-            # ★ After TTS: suppress/ hard reset / grace period
-            suppress_asr_for(POST_TTS_SUPPRESS_SEC)
-            _hard_reset_after_tts()
-            keep_awake(POST_TTS_GRACE_SEC)
-
-    elif domain == "weather":
-        keep_awake(KEEP_AWAKE_ON_ACTIVITY_SEC)
-        try:
-            handle_weather_query(q)
-        finally:
-            suppress_asr_for(POST_TTS_SUPPRESS_SEC)
-            _hard_reset_after_tts()
-            keep_awake(POST_TTS_GRACE_SEC)
+    # 10) Confidence gate — before any network / TTS work
+    if domain in ("fx", "weather") and words:
+        decision, info = gate(domain, words)
+        if decision == "drop":
+            GATE_STATS["dropped"] += 1
+            GATE_STATS["fetches_saved"] += expected_fetches(domain, info["slots"])
+            GATE_STATS["tts_saved"] += 1
+            print(f"[Router] Low confidence, dropped: {q} "
+                  f"(utt={info['utterance']:.2f}, weakest={info['weakest']}) | {stats_line()}")
+            return
+        if decision == "confirm":
+            GATE_STATS["confirm_asked"] += 1
+            _pending_confirm = (domain, q, _now() + CONFIRM_WINDOW_SEC, expected_fetches(domain, info["slots"]))
+            print(f"[Router] Confirm: {q} (weakest={info['weakest']})")
+            try:
+                speak_en(confirm_prompt(domain, info))
+            finally:
+                suppress_asr_for(POST_TTS_SUPPRESS_SEC)
+                _hard_reset_after_tts()
+                _enter_followup("confirm")
+            return
+        GATE_STATS["accepted"] += 1
 
-    else:
-        print(f"[Router] Unknown domain: {q}")
+    # 11) Invoke handlers
+    _dispatch(domain, q)
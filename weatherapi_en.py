@@ -3,21 +3,32 @@ import os
 import time
 import requests
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from gtts import gTTS
 
 # === Settings ===
 WEATHERAPI_KEY = os.environ.get("WEATHERAPI_KEY")   # API key
+WEATHERAPI_BASE_URL = os.environ.get("WEATHERAPI_BASE_URL", "http://api.weatherapi.com/v1")  # 로컬 스텁 서버로 교체 가능
+WEATHERAPI_TIMEOUT_SEC = float(os.environ.get("WEATHERAPI_TIMEOUT_SEC", "10"))
 DEFAULT_CITY = "Toronto"
 UNITS = "metric"   # metric = Celsius, imperial = Fahrenheit
 LANG_TTS = "en"
+WEATHER_MAX_INFLIGHT = 4   # 여러 도시 질의 시 동시에 보내는 요청 수 상한
 
+# 키는 ASR 문법(asr_grammars)에도 그대로 쓰이므로 소문자 + 흔한 오인식 변형 포함
 CITY_ALIASES = {
     "toronto": "Toronto",
     "busan": "Busan",
+    "pusan": "Busan",
     "seoul": "Seoul",
+    "seol": "Seoul",
+    "soul": "Seoul",
     "miyazaki": "Miyazaki",
+    "miyasaki": "Miyazaki",
+    "miya zaki": "Miyazaki",
     "tokyo": "Tokyo",
+    "osaka": "Osaka",
     "new york": "New York",
 }
 
@@ -61,6 +72,15 @@ def parse_city(text: str):
         return m.group(1).strip()
     return DEFAULT_CITY
 
+# Parse all cities in order of appearance ("toronto and tokyo")
+def parse_cities(text: str):
+    found = []
+    for k, v in CITY_ALIASES.items():
+        for m in re.finditer(rf"\b{re.escape(k)}\b", text):
+            found.append((m.start(), v))
+    cities = list(dict.fromkeys(v for _, v in sorted(found)))
+    return cities or [parse_city(text)]
+
 # Detect intent
 def detect_intent(text: str):
     if "temperature" in text:
@@ -75,17 +95,17 @@ def detect_intent(text: str):
 
 # Fetch current weather
 def fetch_current_weather(city: str):
-    url = f"http://api.weatherapi.com/v1/current.json"
+    url = f"{WEATHERAPI_BASE_URL}/current.json"
     params = {"key": WEATHERAPI_KEY, "q": city, "aqi": "no"}
-    r = requests.get(url, params=params, timeout=10)
+    r = requests.get(url, params=params, timeout=WEATHERAPI_TIMEOUT_SEC)
     r.raise_for_status()
     return r.json()
 
 # Fetch forecast
 def fetch_forecast(city: str, days=3):
-    url = f"http://api.weatherapi.com/v1/forecast.json"
+    url = f"{WEATHERAPI_BASE_URL}/forecast.json"
     params = {"key": WEATHERAPI_KEY, "q": city, "days": days, "aqi": "no", "alerts": "no"}
-    r = requests.get(url, params=params, timeout=10)
+    r = requests.get(url, params=params, timeout=WEATHERAPI_TIMEOUT_SEC)
     r.raise_for_status()
     return r.json()
 
@@ -95,22 +115,15 @@ def speak_en(text: str, outfile="tts.mp3"):
     tts.save(outfile)
     subprocess.run(["mpg123", "-q", outfile])
 
-def handle_weather_query(utterance: str):
-    utterance = normalize(utterance)
-    intent = detect_intent(utterance)
-    target_date, date_label = parse_when(utterance)
-    city = parse_city(utterance)
-
-    print("city: " + city)
-
+def weather_message(city: str, intent: str, target_date, date_label: str) -> str:
+    """한 도시의 응답 문장 (요청 실패 시 안내 문장)."""
     try:
         if intent == "forecast" or target_date != datetime.now().date():
             data = fetch_forecast(city, days=5)
             forecast_days = data.get("forecast", {}).get("forecastday", [])
             pick = next((d for d in forecast_days if datetime.strptime(d["date"], "%Y-%m-%d").date() == target_date), None)
             if not pick:
-                speak_en(f"I could not find the forecast for {city} on {date_label}.")
-                return
+                return f"I could not find the forecast for {city} on {date_label}."
             condition = pick["day"]["condition"]["text"]
             avg_temp = pick["day"]["avgtemp_c"]
             max_temp = pick["day"]["maxtemp_c"]
@@ -119,8 +132,7 @@ def handle_weather_query(utterance: str):
             wind = pick["day"]["maxwind_kph"]
 
             msg = f"The weather in {city} on {date_label} will be {condition}, with an average temperature of {avg_temp} degrees Celsius, a high of {max_temp}, a low of {min_temp}, {rain_prob} percent chance of rain, and winds up to {wind} kilometers per hour."
-            speak_en(msg)
-            return
+            return msg
 
         # current
         data = fetch_current_weather(city)
@@ -140,12 +152,30 @@ def handle_weather_query(utterance: str):
             msg = f"The wind speed in {city} is {wind} kilometers per hour, and the weather is {condition}."
         else:
             msg = f"The weather in {city} right now is {condition}, with a temperature of {temp} degrees Celsius and winds at {wind} kilometers per hour."
-        speak_en(msg)
+        return msg
 
     except requests.HTTPError:
-        speak_en("There was a problem connecting to the weather service. Please check the city name or your network.")
+        return f"There was a problem connecting to the weather service for {city}. Please check the city name or your network."
     except Exception as e:
-        speak_en("An unexpected error occurred. Please try again later.")
+        return f"An unexpected error occurred while getting the weather for {city}. Please try again later."
+
+def handle_weather_query(utterance: str):
+    utterance = normalize(utterance)
+    intent = detect_intent(utterance)
+    target_date, date_label = parse_when(utterance)
+    cities = parse_cities(utterance)
+
+    print("city: " + ", ".join(cities))
+
+    if len(cities) == 1:
+        speak_en(weather_message(cities[0], intent, target_date, date_label))
+        return
+
+    # 여러 도시: 동시에 조회 (총 지연 ≈ 가장 느린 한 도시), 응답은 질문 순서대로 한 번에 말하기
+    with ThreadPoolExecutor(max_workers=min(WEATHER_MAX_INFLIGHT, len(cities))) as ex:
+        msgs = list(ex.map(lambda c: weather_message(c, intent, target_date, date_label), cities))
+    # 같은 오류 안내가 도시마다 반복되지 않도록
+    speak_en(" ".join(dict.fromkeys(msgs)))
 
 if __name__ == "__main__":
     test_queries = [
@@ -155,7 +185,8 @@ if __name__ == "__main__":
         "What's the temperature in Seoul?",
         "Is it raining in Miyazaki?",
         "What's the wind speed in Toronto?",
-        "Weather on Friday in Toronto."
+        "Weather on Friday in Toronto.",
+        "What's the weather in Toronto and Tokyo?"
     ]
     for q in test_queries:
         print(">>", q)